@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.contrib import admin
-from django.utils.safestring import mark_safe
+from django.utils.html import format_html
 
-from .models import Category, Comment, Location, Post
+from .images import get_variant_url, has_variants
+from .models import Category, Comment, Job, Location, Post
 
 
 @admin.register(Comment)
@@ -87,8 +89,10 @@ class PostAdmin(admin.ModelAdmin):
     @admin.display(description='Картинка')
     def short_image(self, obj):
         if obj.image:
-            return mark_safe(
-                f'<img src={obj.image.url} width="80" height="60"',
+            return format_html(
+                '<img src="{}" width="80" height="60">',
+                get_variant_url(obj.image, settings.POST_IMAGE_WIDTHS[0])
+                if has_variants(obj.image) else obj.image.url,
             )
         return None
 
@@ -159,6 +163,36 @@ class LocationAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+
+    list_display = (
+        'task',
+        'status',
+        'attempts',
+        'run_after',
+        'created_at',
+        'finished_at',
+    )
+
+    list_filter = (
+        'status',
+        'task',
+    )
+
+    search_fields = (
+        'task',
+        'key',
+    )
+
+    readonly_fields = (
+        'created_at',
+        'locked_at',
+        'finished_at',
+        'last_error',
+    )
+
+
 admin.site.empty_value_display = 'Не задано'
 admin.site.site_title = 'Администрирование Блогикума'
 admin.site.site_header = 'Администрирование Блогикума'
@@ -0,0 +1,206 @@
+"""JSON-версии лент и страницы поста только для чтения.
+
+Посты читаются через .values() по тем же таблицам, что соединяет
+OwnerPostManager, без создания экземпляров моделей. Ленты листаются
+курсором, ответы поддерживают ETag/Last-Modified и 304.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.shortcuts import Http404, get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views import View
+
+from .conditional import content_condition
+from .lookups import get_published_category_or_404
+from .models import Comment, Post
+from .pagination import CursorPaginator, InvalidCursor
+from .views import AnonymousPageCacheMixin
+
+User = get_user_model()
+
+POST_FIELDS = (
+    'pk',
+    'title',
+    'text',
+    'pub_date',
+    'is_published',
+    'image',
+    'comment_count',
+    'author__username',
+    'category__slug',
+    'category__title',
+    'location__name',
+    'location__is_published',
+)
+
+COMMENT_FIELDS = (
+    'pk',
+    'text',
+    'created_at',
+    'author__username',
+)
+
+
+def serialize_post(row):
+    return {
+        'id': row['pk'],
+        'url': reverse('blog:post_detail', args=(row['pk'],)),
+        'title': row['title'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'is_published': row['is_published'],
+        'image': row['image'] and default_storage.url(row['image']),
+        'comment_count': row['comment_count'],
+        'author': row['author__username'],
+        'category': row['category__slug'] and {
+            'slug': row['category__slug'],
+            'title': row['category__title'],
+        },
+        'location': (
+            row['location__name'] if row['location__is_published'] else None
+        ),
+    }
+
+
+def serialize_comment(row):
+    return {
+        'id': row['pk'],
+        'text': row['text'],
+        'created_at': row['created_at'],
+        'author': row['author__username'],
+    }
+
+
+def get_cursor_page(request, queryset, per_page, cursor_kwarg='cursor',
+                    **paginator_kwargs):
+    try:
+        return CursorPaginator(queryset, per_page, **paginator_kwargs).page(
+            request.GET.get(cursor_kwarg),
+        )
+    except InvalidCursor as error:
+        raise Http404(str(error))
+
+
+def get_page_links(request, page, cursor_kwarg='cursor'):
+    def link(cursor):
+        return cursor and (
+            f'{request.path}?{urlencode({cursor_kwarg: cursor})}'
+        )
+
+    return {
+        'next': link(page.next_cursor),
+        'previous': link(page.previous_cursor),
+    }
+
+
+@method_decorator(content_condition, name='dispatch')
+class PostListApiView(AnonymousPageCacheMixin, View):
+    """Лента постов в JSON; подклассы задают выборку в get_queryset."""
+
+    def get_queryset(self):
+        return Post.published_manager.all()
+
+    def get_extra_data(self):
+        return {}
+
+    def get(self, request, *args, **kwargs):
+        page = get_cursor_page(
+            request,
+            self.get_queryset().values(*POST_FIELDS),
+            settings.POSTS_LIMIT,
+        )
+        return JsonResponse({
+            **self.get_extra_data(),
+            'results': [serialize_post(row) for row in page],
+            **get_page_links(request, page),
+        })
+
+
+class CategoryPostsApiView(PostListApiView):
+    category = None
+
+    def get_queryset(self):
+        self.category = get_published_category_or_404(
+            self.kwargs['category_slug'],
+        )
+        return self.category.posts(manager='published_manager').all()
+
+    def get_extra_data(self):
+        return {
+            'category': {
+                'slug': self.category.slug,
+                'title': self.category.title,
+                'description': self.category.description,
+            },
+        }
+
+
+class ProfileApiView(PostListApiView):
+    profile = None
+
+    def get_queryset(self):
+        self.profile = get_object_or_404(
+            User,
+            username=self.kwargs['username'],
+        )
+        return self.profile.posts(
+            manager='owner_manager' if (
+                self.request.user == self.profile
+            ) else 'published_manager'
+        ).all()
+
+    def get_extra_data(self):
+        return {
+            'profile': {
+                'username': self.profile.username,
+                'first_name': self.profile.first_name,
+                'last_name': self.profile.last_name,
+                'date_joined': self.profile.date_joined,
+            },
+        }
+
+
+@method_decorator(content_condition, name='dispatch')
+class PostDetailApiView(AnonymousPageCacheMixin, View):
+    """Пост с первой (или указанной курсором) страницей комментариев."""
+
+    def get_post(self):
+        row = Post.owner_manager.filter(pk=self.kwargs['pk']).values(
+            *POST_FIELDS, 'author_id', 'category__is_published',
+        ).first()
+        if row is None or not (
+            row['author_id'] == self.request.user.pk or (
+                row['is_published']
+                and row['category__is_published']
+                and row['pub_date'] <= timezone.now()
+            )
+        ):
+            raise Http404('Публикация не найдена')
+        return row
+
+    def get(self, request, *args, **kwargs):
+        post = self.get_post()
+        comments = get_cursor_page(
+            request,
+            Comment.objects.filter(
+                post_id=post['pk'],
+            ).values(*COMMENT_FIELDS),
+            settings.COMMENTS_LIMIT,
+            cursor_kwarg='comments_cursor',
+            key_field='created_at',
+            descending=False,
+        )
+        return JsonResponse({
+            **serialize_post(post),
+            'comments': [serialize_comment(row) for row in comments],
+            **{
+                f'comments_{name}': link for name, link in get_page_links(
+                    request, comments, cursor_kwarg='comments_cursor',
+                ).items()
+            },
+        })
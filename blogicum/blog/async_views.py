@@ -0,0 +1,213 @@
+"""Read-only страницы блога с параллельными запросами к базе под ASGI.
+
+Это не асинхронные view в полном смысле слова. as_view() возвращает
+корутину, но сама view — условный GET, кеш страниц, dispatch и рендер
+шаблона из blog/views.py — целиком выполняется в потоке через
+sync_to_async. Асинхронна только сборка контекста: get() запускает
+get_context_data_async() через async_to_sync, и пост со страницей
+комментариев, категория со страницей постов, число постов и строки
+номерной страницы запрашиваются одновременно.
+
+ORM в Django 3.2 синхронный, поэтому каждый запрос уходит в поток через
+run_query(). С ASYNC_VIEWS_PARALLEL_QUERIES потоки и подключения у
+запросов разные и они действительно идут параллельно; без него — по
+очереди в потоке запроса, где видна его транзакция.
+"""
+import asyncio
+from functools import update_wrapper
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Page
+from django.db import close_old_connections
+from django.views.generic.base import ContextMixin
+from django.views.generic.detail import SingleObjectMixin
+
+from . import views
+from .forms import CommentForm
+from .lookups import get_published_category_or_404
+from .models import Post
+from .query_wrappers import inherited_query_wrappers
+
+
+def _in_own_connection(func):
+    # Поток из пула не получает request_started/request_finished:
+    # устаревшее подключение закрывается здесь, как это сделал бы Django.
+    # Метрики и QueryGuard запроса ставятся и на подключения этого потока.
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            with inherited_query_wrappers():
+                return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+def run_query(func, *args, **kwargs):
+    """Выполняет синхронный код с запросами к базе из корутины."""
+    if settings.ASYNC_VIEWS_PARALLEL_QUERIES:
+        return sync_to_async(
+            _in_own_connection(func), thread_sensitive=False,
+        )(*args, **kwargs)
+    return sync_to_async(func)(*args, **kwargs)
+
+
+async def gather(*awaitables):
+    """asyncio.gather() для корутин с run_query().
+
+    Без параллельных запросов корутины ждутся по очереди в текущей
+    задаче: из дочерних задач gather() asgiref 3.5 не находит поток
+    запроса и ждёт его вечно.
+    """
+    if settings.ASYNC_VIEWS_PARALLEL_QUERIES:
+        return await asyncio.gather(*awaitables)
+    return [await awaitable for awaitable in awaitables]
+
+
+async def get_numbered_page(paginator, number):
+    """Номерная страница: число постов и её строки выбираются одновременно.
+
+    Возвращает None, если номер не число или вне диапазона, — такую
+    страницу выбирает синхронный код со своей обработкой ошибок.
+    """
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        return None
+    if number < 1:
+        return None
+    bottom = (number - 1) * paginator.per_page
+    # getattr в потоке сам кеширует paginator.count.
+    _, objects = await gather(
+        run_query(getattr, paginator, 'count'),
+        run_query(
+            list, paginator.object_list[bottom:bottom + paginator.per_page],
+        ),
+    )
+    try:
+        paginator.validate_number(number)
+    except InvalidPage:
+        return None
+    return Page(objects, number, paginator)
+
+
+class AsyncViewMixin:
+    """as_view() возвращает корутину для ASGI.
+
+    Корутина лишь отдаёт синхронную view в поток; параллельны только
+    запросы get_context_data_async() внутри get().
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            return await sync_view(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    def get(self, request, *args, **kwargs):
+        # get_context_data_async() определяет каждая view ниже.
+        return self.render_to_response(
+            async_to_sync(self.get_context_data_async)(),
+        )
+
+
+class AsyncPostPaginationMixin:
+    """Страница постов для асинхронных лент в режиме POSTS_PAGINATION."""
+
+    def get_page_number(self):
+        return (
+            self.kwargs.get('page') or self.request.GET.get('page') or 1
+        )
+
+    def get_numbered_page_sync(self, queryset):
+        return self.paginate_queryset(queryset, self.paginate_by)[1]
+
+    async def get_page_context(self, queryset):
+        if settings.POSTS_PAGINATION == 'cursor':
+            page = await run_query(
+                self.get_cursor_page, queryset, self.paginate_by,
+            )
+        else:
+            page = await get_numbered_page(
+                self.get_paginator(queryset, self.paginate_by),
+                self.get_page_number(),
+            ) or await run_query(self.get_numbered_page_sync, queryset)
+        return {
+            'paginator': page.paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list,
+        }
+
+
+class PostListView(
+    AsyncViewMixin, AsyncPostPaginationMixin, views.PostListView,
+):
+
+    async def get_context_data_async(self):
+        self.object_list = self.get_queryset()
+        return ContextMixin.get_context_data(
+            self, **await self.get_page_context(self.object_list),
+        )
+
+
+class CategoryPostsView(
+    AsyncViewMixin, AsyncPostPaginationMixin, views.CategoryPostsView,
+):
+
+    async def get_context_data_async(self):
+        slug = self.kwargs['category_slug']
+        self.object_list = Post.published_manager.filter(
+            category__slug=slug,
+        )
+        self.category, context = await gather(
+            run_query(get_published_category_or_404, slug),
+            self.get_page_context(self.object_list),
+        )
+        return ContextMixin.get_context_data(
+            self, category=self.category, **context,
+        )
+
+
+class PostDetailView(AsyncViewMixin, views.PostDetailView):
+
+    async def get_context_data_async(self):
+        # Комментарии выбираются по pk из URL, не дожидаясь поста;
+        # если пост скрыт, get_object() всё равно ответит 404.
+        self.object, comments = await gather(
+            run_query(self.get_object),
+            run_query(self.get_comments_page, Post(pk=self.kwargs['pk'])),
+        )
+        return SingleObjectMixin.get_context_data(
+            self, form=CommentForm(), comments=comments,
+        )
+
+
+class ProfileDetailView(
+    AsyncViewMixin, AsyncPostPaginationMixin, views.ProfileDetailView,
+):
+
+    def get_numbered_page_sync(self, queryset):
+        return self.get_paginator(queryset, self.paginate_by).get_page(
+            self.request.GET.get('page'),
+        )
+
+    async def get_context_data_async(self):
+        manager = (
+            Post.owner_manager
+            if await sync_to_async(self.is_owner)()
+            else Post.published_manager
+        )
+        self.object, context = await gather(
+            run_query(self.get_object),
+            self.get_page_context(manager.filter(
+                author__username=self.kwargs['username'],
+            )),
+        )
+        return SingleObjectMixin.get_context_data(self, **context)
@@ -0,0 +1,209 @@
+"""Нагрузочный замер страниц блога на сгенерированных данных.
+
+seed() наполняет базу пользователями, категориями, местами, постами
+и комментариями пачками через bulk_create (значения полей придумывает
+mixer), run_benchmark() прогоняет каждый маршрут blog/urls.py тестовым
+клиентом и считает пропускную способность и p50/p99 задержки.
+Запускается командой manage.py benchmark на отдельной тестовой базе.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from . import urls as blog_urls
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+BULK_BATCH_SIZE = 500
+
+
+def get_scale_counts(posts, comments_per_post):
+    return {
+        'users': max(posts // 20, 5),
+        'categories': max(posts // 100, 3),
+        'locations': max(posts // 100, 3),
+        'posts': posts,
+        'comments': posts * comments_per_post,
+    }
+
+
+def _blend(mixer, model, count, **values):
+    """Создаёт count объектов пачками и возвращает их pk."""
+    with mixer.ctx(commit=False):
+        objects = mixer.cycle(count).blend(model, **values)
+    model.objects.bulk_create(objects, batch_size=BULK_BATCH_SIZE)
+    # SQLite не возвращает pk из bulk_create, а база перед seed() пуста.
+    # Только pk, без моделей: связи ниже задаются через *_id.
+    return list(model.objects.order_by('pk').values_list('pk', flat=True))
+
+
+def seed(posts, comments_per_post=5, seed_value=0):
+    """Создаёт данные одного масштаба; одинаковый seed_value — те же данные.
+
+    Сигналы на bulk_create не срабатывают, поэтому счётчики
+    комментариев и постов и поисковый индекс пересчитываются в конце.
+    """
+    from mixer.backend.django import Mixer
+
+    random.seed(seed_value)
+    mixer = Mixer()
+    mixer.faker.seed_instance(seed_value)
+    counts = get_scale_counts(posts, comments_per_post)
+    now = timezone.now()
+
+    users = _blend(
+        mixer, User, counts['users'],
+        username=mixer.sequence('bench_user_{0}'),
+        is_staff=False,
+    )
+    categories = _blend(
+        mixer, Category, counts['categories'],
+        slug=mixer.sequence('bench-category-{0}'),
+        is_published=True,
+    )
+    locations = _blend(
+        mixer, Location, counts['locations'], is_published=True,
+    )
+    posts = _blend(
+        mixer, Post, counts['posts'],
+        author_id=lambda: random.choice(users),
+        category_id=lambda: random.choice(categories),
+        location_id=lambda: random.choice(locations),
+        image='',
+        is_published=True,
+        # Каждый двадцатый пост отложен на будущее.
+        pub_date=lambda: now + timedelta(
+            hours=random.randint(-24 * 365, 24 * 365 // 19),
+        ),
+    )
+    _blend(
+        mixer, Comment, counts['comments'],
+        author_id=lambda: random.choice(users),
+        post_id=lambda: random.choice(posts),
+    )
+    call_command('rebuild_comment_counts', stdout=StringIO())
+    call_command('rebuild_search_index', stdout=StringIO())
+    call_command('reconcile_post_counts', stdout=StringIO())
+    return counts
+
+
+def get_url_kwargs():
+    """Параметры маршрутов: самый комментируемый видимый пост."""
+    post = Post.published_manager.order_by('-comment_count').first()
+    comment = post.comments.order_by('pk').first()
+    return post.author, {
+        'pk': post.pk,
+        'comment_id': comment.pk if comment else 0,
+        'category_slug': post.category.slug,
+        'username': post.author.username,
+    }
+
+
+def get_blog_urls(kwargs):
+    for pattern in blog_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern):
+            continue
+        yield pattern.name, reverse(f'blog:{pattern.name}', kwargs={
+            key: kwargs[key] for key in pattern.pattern.converters
+        })
+
+
+def measure(client, path, requests, warmup=1, cold=False):
+    for _ in range(warmup):
+        client.get(path)
+    latencies = []
+    status = None
+    started = time.perf_counter()
+    for _ in range(requests):
+        if cold:
+            cache.clear()
+        start = time.perf_counter()
+        status = client.get(path).status_code
+        latencies.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+    return {
+        'status': status,
+        'requests': requests,
+        'throughput_rps': requests / elapsed if elapsed else None,
+        **get_latency_stats(latencies),
+    }
+
+
+def get_latency_stats(latencies):
+    """Среднее, p50, p99 и максимум задержек (в секундах) в миллисекундах."""
+    if not latencies:
+        return {}
+    percentiles = (
+        statistics.quantiles(latencies, n=100, method='inclusive')
+        if len(latencies) > 1 else latencies * 99
+    )
+    return {
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'p50_ms': percentiles[49] * 1000,
+        'p99_ms': percentiles[98] * 1000,
+        'max_ms': max(latencies) * 1000,
+    }
+
+
+@contextmanager
+def benchmark_database():
+    """Отдельная тестовая база на время замера.
+
+    Как в тестах, DEBUG выключен, иначе замер покажет работу
+    debug_toolbar и журнала connection.queries.
+    """
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False,
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def run_benchmark(scales, requests=50, comments_per_post=5,
+                  roles=('guest',), cold=False, log=None):
+    """Замеры всех маршрутов на каждом масштабе; база очищается между ними.
+
+    cold=True сбрасывает кеш перед каждым запросом, иначе замер
+    показывает работу с прогретым кешем страниц и карточек.
+    """
+    results = []
+    for scale in scales:
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+        counts = seed(scale, comments_per_post)
+        author, kwargs = get_url_kwargs()
+        clients = {'guest': Client(), 'author': Client()}
+        clients['author'].force_login(author)
+        for role in roles:
+            for name, path in get_blog_urls(kwargs):
+                result = measure(clients[role], path, requests, cold=cold)
+                results.append({
+                    'scale': counts,
+                    'role': role,
+                    'url': name,
+                    'path': path,
+                    **result,
+                })
+                if log:
+                    log(f'{scale:>8} {role:<6} {name:<24} '
+                        f'p50={result["p50_ms"]:.1f}ms '
+                        f'p99={result["p99_ms"]:.1f}ms')
+    return results
@@ -0,0 +1,201 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from .images import has_variants
+from .jobs import enqueue_many
+from .publication_clock import get_next_publication_timestamp
+
+POST_CARD_GENERATION_KEY = 'post_card:generation'
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def get_post_card_generation():
+    """Возвращает текущее поколение кеша карточек постов.
+
+    Если ключ поколения вытеснен из кеша, новое поколение начинается
+    с текущего времени, чтобы не совпасть с уцелевшими карточками.
+    """
+    generation = cache.get(POST_CARD_GENERATION_KEY)
+    if generation is None:
+        cache.add(POST_CARD_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(POST_CARD_GENERATION_KEY)
+    return generation
+
+
+def get_post_card_key(post_pk, generation):
+    return f'post_card:{generation}:{post_pk}'
+
+
+def render_post_cards(posts):
+    """Возвращает HTML карточек постов, дорисовывая только промахи кеша.
+
+    Кеш читается и пополняется пакетно: один get_many и один set_many
+    на страницу ленты.
+    """
+    posts = list(posts)
+    generation = get_post_card_generation()
+    keys = [get_post_card_key(post.pk, generation) for post in posts]
+    cards = cache.get_many(keys)
+    missed_posts = [
+        post for key, post in zip(keys, posts) if key not in cards
+    ]
+    queue_image_variants(missed_posts)
+    missed = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missed[key] = cards[key] = render_to_string(
+                POST_CARD_TEMPLATE,
+                {'post': post, 'variants_queued': True},
+            )
+    if missed:
+        cache.set_many(missed, timeout=settings.POST_CARD_CACHE_TIMEOUT)
+    return [cards[key] for key in keys]
+
+
+def queue_image_variants(posts):
+    """Одной пачкой ставит создание копий картинок, которых ещё нет."""
+    payloads = {
+        f'image_variants:{post.pk}': {'post_pk': post.pk}
+        for post in posts
+        if post.image and not has_variants(post.image)
+    }
+    if payloads:
+        enqueue_many('blog.tasks.generate_image_variants', payloads)
+
+
+def invalidate_post_card(post_pk):
+    cache.delete(get_post_card_key(post_pk, get_post_card_generation()))
+
+
+def invalidate_post_cards():
+    """Сбрасывает все карточки разом, например при правке категории."""
+    try:
+        cache.incr(POST_CARD_GENERATION_KEY)
+    except ValueError:
+        # Ключа нет — следующее чтение само начнёт новое поколение.
+        pass
+
+
+CONTENT_GENERATION_KEY = 'content:generation'
+CONTENT_CHANGED_AT_KEY = 'content:changed_at'
+PAGE_LOCK_TIMEOUT = 30
+PAGE_LOCK_WAIT = 2.0
+PAGE_LOCK_POLL_INTERVAL = 0.05
+
+
+def get_content_generation():
+    """Поколение контента: меняется при любой записи постов и комментариев."""
+    generation = cache.get(CONTENT_GENERATION_KEY)
+    if generation is None:
+        cache.add(CONTENT_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(CONTENT_GENERATION_KEY)
+    return generation
+
+
+def bump_content_generation():
+    try:
+        cache.incr(CONTENT_GENERATION_KEY)
+    except ValueError:
+        pass
+    cache.set(CONTENT_CHANGED_AT_KEY, time.time(), timeout=None)
+
+
+def get_content_changed_at():
+    """Время последней записи контента (Unix) для Last-Modified."""
+    changed_at = cache.get(CONTENT_CHANGED_AT_KEY)
+    if changed_at is None:
+        cache.add(CONTENT_CHANGED_AT_KEY, time.time(), timeout=None)
+        changed_at = cache.get(CONTENT_CHANGED_AT_KEY)
+    return changed_at
+
+
+def get_page_key(request, generation):
+    return f'page:{generation}:{request.get_full_path()}'
+
+
+def is_page_cacheable(request):
+    return (
+        settings.PAGE_CACHE_TIMEOUT > 0
+        and request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def _store_page(key, response):
+    now = time.time()
+    # Страница устаревает окончательно, когда выходит отложенный пост.
+    expires_at = min(
+        now + settings.PAGE_CACHE_TIMEOUT + settings.PAGE_CACHE_STALE_TIMEOUT,
+        get_next_publication_timestamp(),
+    )
+    if expires_at <= now:
+        return
+    cache.set(
+        key,
+        {
+            'fresh_until': min(now + settings.PAGE_CACHE_TIMEOUT, expires_at),
+            'expires_at': expires_at,
+            'status': response.status_code,
+            'content': response.content,
+            'headers': list(response.items()),
+        },
+        timeout=math.ceil(expires_at - now),
+    )
+
+
+def _restore_page(entry):
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    return response
+
+
+def _render_page(key, render):
+    response = render()
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    if response.status_code == 200 and not response.cookies:
+        _store_page(key, response)
+    return response
+
+
+def get_or_render_page(request, render):
+    """Отдаёт страницу для анонимного GET из кеша или рисует её.
+
+    Ключ включает поколение контента, поэтому после записи устаревшая
+    страница не отдаётся. Внутри поколения запись живёт
+    PAGE_CACHE_TIMEOUT секунд свежей и ещё PAGE_CACHE_STALE_TIMEOUT
+    устаревшей: пока один запрос под блокировкой перерисовывает
+    страницу, остальные получают устаревшую копию. При полном промахе
+    остальные запросы недолго ждут, пока страницу нарисует первый.
+    Ни свежая, ни устаревшая копия не переживает ближайшую отложенную
+    публикацию.
+    """
+    key = get_page_key(request, get_content_generation())
+    lock_key = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None and entry['expires_at'] <= time.time():
+        entry = None
+    if entry is not None:
+        if entry['fresh_until'] > time.time() or not cache.add(
+            lock_key, True, timeout=PAGE_LOCK_TIMEOUT,
+        ):
+            return _restore_page(entry)
+    elif not cache.add(lock_key, True, timeout=PAGE_LOCK_TIMEOUT):
+        deadline = time.monotonic() + PAGE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(PAGE_LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return _restore_page(entry)
+        return render()
+
+    try:
+        return _render_page(key, render)
+    finally:
+        cache.delete(lock_key)
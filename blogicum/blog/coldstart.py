@@ -0,0 +1,156 @@
+"""Замер холодного старта: запуск процесса и первые запросы к каждой странице.
+
+Каждый замер — новый процесс python -m blog.coldstart, как после деплоя
+или перезапуска воркера. Процесс поднимает Django через wsgi.py,
+как сервер, с прогревом из blog/warmup.py или без него и по разу
+запрашивает все маршруты
+blog/urls.py тестовым клиентом. База — отдельный файл SQLite, который
+заранее наполняет такой же процесс в режиме --prepare.
+
+Модуль запускается до django.setup(), поэтому Django импортируется
+только внутри функций.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+TIMINGS = ('setup_s', 'first_response_s', 'first_pass_s', 'ready_s')
+
+
+def configure(db_name, warmup):
+    """Настройки процесса замера; вызывается до django.setup()."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    from django.conf import settings
+
+    # Как в бою и в manage.py benchmark: без debug_toolbar.
+    settings.DEBUG = False
+    settings.TEMPLATE_WARMUP = warmup
+    settings.DATABASES['default']['NAME'] = db_name
+
+
+def prepare(db_name, posts):
+    """Создаёт и наполняет базу; возвращает пути страниц для замера."""
+    import django
+
+    configure(db_name, warmup=False)
+    django.setup()
+
+    from django.core.management import call_command
+
+    from .benchmark import get_blog_urls, get_url_kwargs, seed
+
+    call_command('migrate', verbosity=0)
+    seed(posts)
+    _, kwargs = get_url_kwargs()
+    return [path for _, path in get_blog_urls(kwargs)]
+
+
+def measure_process(db_name, warmup, paths):
+    """Время запуска и первого запроса к каждой странице в этом процессе."""
+    started = time.perf_counter()
+    configure(db_name, warmup)
+    import blogicum.wsgi  # noqa: F401
+
+    setup_s = time.perf_counter() - started
+
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+    client = Client()
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        client.get(path)
+        latencies.append(time.perf_counter() - start)
+    return {
+        'setup_s': setup_s,
+        'first_response_s': latencies[0],
+        'first_pass_s': sum(latencies),
+        'ready_s': setup_s + sum(latencies),
+    }
+
+
+def run_child(args):
+    result = subprocess.run(
+        [sys.executable, '-m', __name__, *args],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def summarize(mode, runs):
+    return {
+        'mode': mode,
+        'runs': len(runs),
+        **{
+            key: statistics.median(run[key] for run in runs)
+            for key in TIMINGS
+        },
+    }
+
+
+def run_startup_benchmark(posts=200, runs=5):
+    """Медианы замеров без прогрева и с прогревом.
+
+    Процессы с прогревом и без чередуются, чтобы фоновая нагрузка
+    на машину делилась между режимами поровну.
+    """
+    from django.conf import settings
+
+    cwd = os.getcwd()
+    os.chdir(settings.BASE_DIR)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            db_name = os.path.join(directory, 'coldstart.sqlite3')
+            paths = run_child(
+                ['--db', db_name, '--prepare', '--posts', str(posts)],
+            )
+            measured = {False: [], True: []}
+            for _ in range(runs):
+                for warmup in measured:
+                    measured[warmup].append(run_child(
+                        ['--db', db_name, '--warmup', str(int(warmup)),
+                         *paths],
+                    ))
+    finally:
+        os.chdir(cwd)
+    results = [
+        summarize('cold', measured[False]),
+        summarize('warmup', measured[True]),
+    ]
+    results.append({
+        'mode': 'improvement',
+        'pages': len(paths),
+        **{
+            key: results[0][key] - results[1][key]
+            for key in TIMINGS
+        },
+    })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--prepare', action='store_true')
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('paths', nargs='*')
+    args = parser.parse_args()
+    if args.prepare:
+        result = prepare(args.db, args.posts)
+    else:
+        result = measure_process(args.db, bool(args.warmup), args.paths)
+    print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Валидаторы условных GET-запросов (ETag и Last-Modified).
+
+Версия контента берётся из кеша и не требует запросов к базе, поэтому
+ответ 304 отдаётся раньше любого чтения постов. Оба валидатора общие
+для всего сайта: любая запись контента меняет их на всех страницах.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from django.views.decorators.http import condition
+
+from .cache import get_content_changed_at, get_content_generation
+from .publication_clock import (get_last_publication_timestamp,
+                                get_next_publication_timestamp)
+
+
+def get_content_etag(request, *args, **kwargs):
+    # Зритель входит в версию: автор видит свои неопубликованные посты.
+    # В страницах вошедшего пользователя есть CSRF-токен, а он меняется
+    # при каждом входе вместе с ключом сессии.
+    viewer = request.user.pk or 0
+    if request.user.is_authenticated:
+        viewer = f'{viewer}:{request.session.session_key}'
+    version = ':'.join(map(str, (
+        get_content_generation(),
+        get_next_publication_timestamp(),
+        viewer,
+    )))
+    return hashlib.md5(version.encode()).hexdigest()
+
+
+def get_content_last_modified(request, *args, **kwargs):
+    # Вышедшая отложенная публикация меняет ленты без записи в базу.
+    return datetime.fromtimestamp(
+        max(get_content_changed_at(), get_last_publication_timestamp()),
+        tz=timezone.utc,
+    )
+
+
+content_condition = condition(
+    etag_func=get_content_etag,
+    last_modified_func=get_content_last_modified,
+)
@@ -0,0 +1,298 @@
+"""Потоковые выгрузка и загрузка контента блога в формате JSON Lines.
+
+Строка файла — один объект: {"type": "post", ...поля}. Автор и
+категория записаны естественными ключами — username и slug. У мест
+уникального поля нет, поэтому места, посты и комментарии сохраняют свои
+id и ссылаются друг на друга по ним без таблицы соответствий в памяти.
+
+Загрузка идёт одной транзакцией. Уже загруженные строки пропускаются,
+так что повторная загрузка того же файла безопасна. Если id места,
+поста или комментария в базе занят другой строкой, загрузка
+отменяется целиком: иначе комментарии достались бы чужому посту.
+
+Хеши паролей пользователей выгружаются только с with_passwords;
+пользователь без хеша загружается с непригодным паролем.
+
+Выгрузка читает базу через .values().iterator(), загрузка пишет пачками
+bulk_create; память не зависит от размера файла. bulk_create не шлёт
+post_save, так что счётчики, поисковый индекс и кеши пересчитываются
+один раз в конце, а не на каждую строку.
+"""
+import gzip
+import json
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Порядок важен: объект выгружается после всех, на кого ссылается.
+EXPORT_FIELDS = {
+    'user': (User, (
+        'username', 'first_name', 'last_name', 'email', 'is_active',
+        'date_joined',
+    )),
+    'category': (Category, (
+        'slug', 'title', 'description', 'is_published', 'created_at',
+    )),
+    'location': (Location, ('id', 'name', 'is_published', 'created_at')),
+    'post': (Post, (
+        'id', 'title', 'text', 'pub_date', 'is_published', 'created_at',
+        'image', 'author__username', 'category__slug', 'location_id',
+    )),
+    'comment': (Comment, (
+        'id', 'text', 'created_at', 'post_id', 'author__username',
+    )),
+}
+
+RENAMED_FIELDS = {
+    'author__username': 'author',
+    'category__slug': 'category',
+    'location_id': 'location',
+    'post_id': 'post',
+}
+
+# Естественные ключи: строка с таким значением уже загружена.
+NATURAL_KEYS = {
+    'user': 'username',
+    'category': 'slug',
+}
+
+# Поля, по которым строка с занятым id считается той же самой.
+IDENTITY_FIELDS = {
+    'location': ('name', 'created_at'),
+    'post': ('author_id', 'title', 'created_at'),
+    'comment': ('post_id', 'author_id', 'created_at'),
+}
+
+
+class ContentImportError(Exception):
+    pass
+
+
+class DumpEncoder(DjangoJSONEncoder):
+    """Даты с микросекундами: DjangoJSONEncoder режет их до миллисекунд."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def open_dump(path, mode):
+    """Файл выгрузки; *.gz открывается со сжатием."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def export_rows(chunk_size=2000, with_passwords=False):
+    for row_type, (model, fields) in EXPORT_FIELDS.items():
+        if row_type == 'user' and with_passwords:
+            fields = (*fields, 'password')
+        rows = model.objects.order_by('pk').values(*fields).iterator(
+            chunk_size=chunk_size,
+        )
+        for row in rows:
+            yield {
+                'type': row_type,
+                **{
+                    RENAMED_FIELDS.get(name, name): value
+                    for name, value in row.items()
+                },
+            }
+
+
+def export_content(file, chunk_size=2000, with_passwords=False):
+    """Пишет все строки выгрузки в file пачками по chunk_size."""
+    lines = []
+    written = 0
+    for row in export_rows(chunk_size, with_passwords):
+        lines.append(json.dumps(row, cls=DumpEncoder,
+                                ensure_ascii=False) + '\n')
+        if len(lines) >= chunk_size:
+            file.writelines(lines)
+            written += len(lines)
+            lines = []
+    file.writelines(lines)
+    return written + len(lines)
+
+
+def _lookup(model, field, values):
+    """{естественный ключ: pk} для ключей одной пачки."""
+    return dict(model.objects.filter(
+        **{f'{field}__in': set(values)},
+    ).values_list(field, 'pk'))
+
+
+def _resolve(rows, name, mapping, required=True):
+    for row in rows:
+        key = row.pop(name)
+        if key is None and not required:
+            row[f'{name}_id'] = None
+            continue
+        if key not in mapping:
+            raise ContentImportError(f'Не найден {name}: {key!r}')
+        row[f'{name}_id'] = mapping[key]
+
+
+def _build_users(rows):
+    users = [User(**row) for row in rows]
+    for user in users:
+        if not user.password:
+            user.set_unusable_password()
+    return users
+
+
+def _build_categories(rows):
+    return [Category(**row) for row in rows]
+
+
+def _build_locations(rows):
+    return [Location(**row) for row in rows]
+
+
+def _build_posts(rows):
+    _resolve(rows, 'author', _lookup(
+        User, 'username', (row['author'] for row in rows),
+    ))
+    _resolve(rows, 'category', _lookup(
+        Category, 'slug', (row['category'] for row in rows),
+    ), required=False)
+    for row in rows:
+        row['location_id'] = row.pop('location')
+    return [Post(**row) for row in rows]
+
+
+def _build_comments(rows):
+    _resolve(rows, 'author', _lookup(
+        User, 'username', (row['author'] for row in rows),
+    ))
+    for row in rows:
+        row['post_id'] = row.pop('post')
+    return [Comment(**row) for row in rows]
+
+
+BUILDERS = {
+    'user': _build_users,
+    'category': _build_categories,
+    'location': _build_locations,
+    'post': _build_posts,
+    'comment': _build_comments,
+}
+
+
+def _identity(model, fields, obj):
+    return tuple(
+        model._meta.get_field(name).to_python(getattr(obj, name))
+        for name in fields
+    )
+
+
+def _skip_loaded(row_type, objects):
+    """Отбрасывает уже загруженные строки пачки.
+
+    Строка с id, занятым в базе другой строкой, — ContentImportError.
+    """
+    model = EXPORT_FIELDS[row_type][0]
+    if row_type in NATURAL_KEYS:
+        field = NATURAL_KEYS[row_type]
+        existing = set(model.objects.filter(**{
+            f'{field}__in': [getattr(obj, field) for obj in objects],
+        }).values_list(field, flat=True))
+        return [obj for obj in objects if getattr(obj, field) not in existing]
+
+    fields = IDENTITY_FIELDS[row_type]
+    existing = {
+        row[0]: row[1:]
+        for row in model.objects.filter(
+            pk__in=[obj.pk for obj in objects],
+        ).values_list('pk', *fields)
+    }
+    for obj in objects:
+        if obj.pk in existing and (
+            existing[obj.pk] != _identity(model, fields, obj)
+        ):
+            raise ContentImportError(
+                f'{row_type} id={obj.pk}: id занят в базе другой строкой',
+            )
+    return [obj for obj in objects if obj.pk not in existing]
+
+
+def _restore_dates(row_type, objects, fields, dates):
+    """Возвращает даты из выгрузки, которые bulk_create заменил на now().
+
+    auto_now_add срабатывает и в bulk_create, поэтому created_at
+    записывается вторым запросом — bulk_update по pk.
+    """
+    model = EXPORT_FIELDS[row_type][0]
+    if row_type in NATURAL_KEYS:
+        # Строки без id из выгрузки: bulk_create в SQLite pk не вернёт.
+        field = NATURAL_KEYS[row_type]
+        pks = _lookup(model, field, (getattr(obj, field) for obj in objects))
+        for obj in objects:
+            obj.pk = pks[getattr(obj, field)]
+    for obj, values in zip(objects, dates):
+        for name, value in zip(fields, values):
+            setattr(obj, name, value)
+    model.objects.bulk_update(objects, fields)
+
+
+def _flush(row_type, rows, stats):
+    if not rows:
+        return
+    model = EXPORT_FIELDS[row_type][0]
+    objects = _skip_loaded(row_type, BUILDERS[row_type](rows))
+    fields = [
+        field.attname for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    dates = [[getattr(obj, name) for name in fields] for obj in objects]
+    model.objects.bulk_create(objects)
+    if fields and objects:
+        _restore_dates(row_type, objects, fields, dates)
+    stats[row_type] = stats.get(row_type, 0) + len(objects)
+
+
+def import_content(file, batch_size=1000):
+    """Загружает строки выгрузки пачками; возвращает {тип: добавлено строк}."""
+    stats = {}
+    batch_type, batch = None, []
+    with transaction.atomic():
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                row_type = row.pop('type')
+            except (ValueError, KeyError, AttributeError):
+                raise ContentImportError(
+                    f'Строка {number}: не объект выгрузки',
+                )
+            if row_type not in BUILDERS:
+                raise ContentImportError(
+                    f'Строка {number}: неизвестный тип {row_type!r}',
+                )
+            if row_type != batch_type or len(batch) >= batch_size:
+                _flush(batch_type, batch, stats)
+                batch_type, batch = row_type, []
+            batch.append(row)
+        _flush(batch_type, batch, stats)
+    _reset_sequences()
+    return stats
+
+
+def _reset_sequences():
+    # Места, посты и комментарии пришли со своими id: счётчики pk
+    # в PostgreSQL нужно сдвинуть, SQLite делает это сам.
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [Location, Post, Comment],
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
@@ -0,0 +1,132 @@
+"""RSS и Atom ленты опубликованных постов: общая, категории и автора.
+
+Каждая лента берёт не больше FEED_ITEMS_LIMIT свежих постов по индексу
+(-pub_date, -id). Готовый XML кешируется по дате самого свежего поста:
+вышедшая отложенная публикация сама меняет ключ, а правки — поколение
+контента.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from .cache import get_content_generation
+from .lookups import get_published_category_or_404
+from .models import Post
+
+User = get_user_model()
+
+
+class LatestPostsFeed(Feed):
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума'
+
+    def link(self, obj):
+        return reverse('blog:index')
+
+    def get_posts(self, obj):
+        return Post.published_manager.all()
+
+    def items(self, obj):
+        return self.get_posts(obj).order_by(
+            '-pub_date', '-pk',
+        )[:settings.FEED_ITEMS_LIMIT]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return (item.category.title,)
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        newest = self.get_posts(obj).aggregate(newest=Max('pub_date'))
+        key = 'feed:{}:{}:{}'.format(
+            get_content_generation(),
+            newest['newest'] and newest['newest'].timestamp(),
+            request.get_full_path(),
+        )
+        entry = cache.get(key)
+        if entry is not None:
+            return HttpResponse(entry['content'],
+                                content_type=entry['content_type'])
+        response = super().__call__(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                },
+                timeout=settings.FEED_CACHE_TIMEOUT,
+            )
+        return response
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+
+    def get_object(self, request, category_slug):
+        return get_published_category_or_404(category_slug)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=(obj.slug,))
+
+    def get_posts(self, obj):
+        return obj.posts(manager='published_manager').all()
+
+
+class ProfilePostsFeed(LatestPostsFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Блогикум: публикации {obj.username}'
+
+    def description(self, obj):
+        return f'Новые публикации пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=(obj.username,))
+
+    def get_posts(self, obj):
+        return obj.posts(manager='published_manager').all()
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryPostsAtomFeed(AtomFeedMixin, CategoryPostsFeed):
+    pass
+
+
+class ProfilePostsAtomFeed(AtomFeedMixin, ProfilePostsFeed):
+    pass
@@ -1,12 +1,63 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserChangeForm
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
 
+from .lookups import get_lookup_table
 from .models import Comment, Post
 
 User = get_user_model()
 
 
+class LookupChoiceIterator(ModelChoiceIterator):
+    """Варианты выбора из справочника в памяти вместо запроса к базе."""
+
+    def get_objects(self):
+        return get_lookup_table(self.queryset.model).objects
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.get_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.get_objects()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.get_objects())
+
+
+class LookupChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField по справочнику из blog/lookups.py.
+
+    Предлагает и принимает все строки таблицы: limit_choices_to и
+    to_field_name не поддерживаются.
+    """
+
+    iterator = LookupChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        model = self.queryset.model
+        if isinstance(value, model):
+            value = value.pk
+        try:
+            obj = get_lookup_table(model).get(
+                'pk', model._meta.pk.to_python(value),
+            )
+        except ValidationError:
+            obj = None
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+            )
+        return obj
+
+
 class PostForm(forms.ModelForm):
 
     class Meta:
@@ -16,6 +67,10 @@ class PostForm(forms.ModelForm):
             # 'is_published',
             # 'created_at',
         )
+        field_classes = {
+            'category': LookupChoiceField,
+            'location': LookupChoiceField,
+        }
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'},
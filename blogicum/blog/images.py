@@ -0,0 +1,93 @@
+"""Производные изображения постов: уменьшенные копии и WebP.
+
+Для каждой ширины из settings.POST_IMAGE_WIDTHS рядом с оригиналом
+в подкаталоге thumbs/ сохраняются две копии: WebP и JPEG/PNG для
+браузеров без WebP. Копии создаёт фоновая задача
+blog.tasks.generate_image_variants: её ставит загрузка картинки, а для
+старых постов — первая отрисовка. Пока копий нет, отдаётся оригинал.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+THUMBS_DIR = 'thumbs'
+WEBP = 'webp'
+
+
+def get_fallback_extension(name):
+    extension = posixpath.splitext(name)[1].lower()
+    return 'jpg' if extension in ('.jpg', '.jpeg') else 'png'
+
+
+def get_variant_name(name, width, extension):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(
+        directory, THUMBS_DIR, f'{stem}_{width}w.{extension}',
+    )
+
+
+def _save_variant(storage, name, image, extension):
+    if extension == 'jpg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format={'jpg': 'JPEG', 'png': 'PNG', WEBP: 'WEBP'}[extension],
+        quality=settings.POST_IMAGE_QUALITY,
+        optimize=True,
+    )
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def generate_variants(image):
+    """Создаёт все производные копии для файла картинки поста."""
+    with image.open('rb'):
+        source = ImageOps.exif_transpose(Image.open(image))
+        source.load()
+    fallback = get_fallback_extension(image.name)
+    for width in settings.POST_IMAGE_WIDTHS:
+        resized = source.copy()
+        # thumbnail() не увеличивает картинку, только уменьшает.
+        resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        for extension in (WEBP, fallback):
+            _save_variant(
+                image.storage,
+                get_variant_name(image.name, width, extension),
+                resized,
+                extension,
+            )
+
+
+def has_variants(image):
+    """Созданы ли копии: проверяется файл, который пишется последним."""
+    return image.storage.exists(get_variant_name(
+        image.name,
+        settings.POST_IMAGE_WIDTHS[-1],
+        get_fallback_extension(image.name),
+    ))
+
+
+def get_srcsets(image):
+    """Словарь srcset по форматам: {'webp': ..., 'fallback': ...}."""
+    fallback = get_fallback_extension(image.name)
+    return {
+        key: ', '.join(
+            f'{image.storage.url(get_variant_name(image.name, width, ext))} '
+            f'{width}w'
+            for width in settings.POST_IMAGE_WIDTHS
+        )
+        for key, ext in (('webp', WEBP), ('fallback', fallback))
+    }
+
+
+def get_variant_url(image, width):
+    extension = get_fallback_extension(image.name)
+    return image.storage.url(get_variant_name(image.name, width, extension))
@@ -0,0 +1,122 @@
+"""Очередь фоновых задач в основной базе данных.
+
+Задача — обычная функция, которую можно импортировать по пути
+(например, 'blog.tasks.send_email'), с аргументами, сериализуемыми
+в JSON. enqueue() ставит её в очередь, manage.py runworker выполняет.
+Упавшая задача повторяется с экспоненциальной задержкой, пока не
+исчерпает max_attempts; задача, чей исполнитель пропал, через
+JOBS_LOCK_TIMEOUT секунд снова становится доступной.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, *, key='', **payload):
+    """Ставит задачу в очередь; с key — только если такой ещё нет."""
+    # Очередь ставится и из GET: проверка дублей — на основной базе,
+    # а не на отстающей реплике.
+    jobs = Job.objects.db_manager(DEFAULT_DB_ALIAS)
+    if key and jobs.filter(
+        key=key,
+        status__in=(Job.Status.PENDING, Job.Status.RUNNING),
+    ).exists():
+        return None
+    return jobs.create(task=task, key=key, payload=payload)
+
+
+def enqueue_many(task, payloads):
+    """Ставит пачку задач двумя запросами; payloads — {key: payload}.
+
+    Ключи, по которым задача уже ждёт или выполняется, пропускаются.
+    """
+    jobs = Job.objects.db_manager(DEFAULT_DB_ALIAS)
+    queued = set(jobs.filter(
+        key__in=payloads,
+        status__in=(Job.Status.PENDING, Job.Status.RUNNING),
+    ).values_list('key', flat=True))
+    return jobs.bulk_create(
+        Job(task=task, key=key, payload=payload)
+        for key, payload in payloads.items()
+        if key not in queued
+    )
+
+
+def _available_jobs(now):
+    return Job.objects.filter(
+        Q(status=Job.Status.PENDING, run_after__lte=now)
+        | Q(
+            status=Job.Status.RUNNING,
+            locked_at__lt=now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT),
+        ),
+    )
+
+
+def claim_job():
+    """Атомарно забирает одну доступную задачу и возвращает её id.
+
+    SQLite не умеет SELECT ... FOR UPDATE SKIP LOCKED, поэтому задача
+    забирается условным UPDATE: если другой исполнитель успел раньше,
+    обновится ноль строк и берётся следующий кандидат.
+    """
+    now = timezone.now()
+    candidates = _available_jobs(now).order_by('run_after').values_list(
+        'pk', flat=True,
+    )[:settings.JOBS_CLAIM_BATCH]
+    for pk in candidates:
+        if _available_jobs(now).filter(pk=pk).update(
+            status=Job.Status.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        ):
+            return pk
+    return None
+
+
+def execute_job(pk):
+    """Выполняет забранную задачу и записывает результат."""
+    job = Job.objects.get(pk=pk)
+    try:
+        import_string(job.task)(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+            logger.error('Задача %s не выполнена: %s', pk, job.last_error)
+        else:
+            job.status = Job.Status.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1),
+            )
+        job.locked_at = None
+        job.save(update_fields=(
+            'status', 'run_after', 'locked_at', 'last_error', 'finished_at',
+        ))
+        return job.status
+
+    Job.objects.filter(pk=pk).update(
+        status=Job.Status.DONE,
+        locked_at=None,
+        finished_at=timezone.now(),
+    )
+    return Job.Status.DONE
+
+
+def run_pending_jobs():
+    """Выполняет все доступные задачи в текущем процессе."""
+    count = 0
+    while (pk := claim_job()) is not None:
+        execute_job(pk)
+        count += 1
+    return count
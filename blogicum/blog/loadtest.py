@@ -0,0 +1,238 @@
+"""Сравнение WSGI и ASGI под нагрузкой медленных клиентов.
+
+Медленный клиент (мобильная сеть) долго забирает ответ. Синхронный
+WSGI-сервер вроде gunicorn с sync-воркерами держит воркер, пока ответ
+не отправлен целиком, и быстрые клиенты ждут в очереди. ASGI-сервер
+ждёт отправки в цикле событий и воркеров не занимает.
+
+Оба пути прогоняются в процессе без сети. WSGI — пул из workers
+потоков, каждый отдаёт ответ клиенту и для медленного засыпает на
+slow_delay. ASGI — один цикл событий с ASGIHandler и асинхронными
+view, где так же засыпает send() медленного клиента.
+"""
+import asyncio
+import importlib
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import override_settings
+from django.urls import clear_url_caches, reverse
+
+from .benchmark import get_latency_stats, get_url_kwargs
+
+
+def get_load_paths():
+    _, kwargs = get_url_kwargs()
+    return [
+        reverse('blog:index'),
+        reverse('blog:post_detail', args=(kwargs['pk'],)),
+        reverse('blog:category_posts', args=(kwargs['category_slug'],)),
+        reverse('blog:profile', args=(kwargs['username'],)),
+    ]
+
+
+@contextmanager
+def blog_views(use_async):
+    """Подключает синхронные или асинхронные view из blog/urls.py."""
+
+    def reload_urls():
+        from . import urls
+
+        importlib.reload(urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    try:
+        with override_settings(ASYNC_VIEWS=use_async):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+def make_environ(path):
+    path, _, query = path.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def make_scope(path):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+
+
+def serve_wsgi(application, path, slow, delay):
+    """Запрос через WSGI: воркер занят, пока клиент забирает ответ."""
+    statuses = []
+    body = application(
+        make_environ(path),
+        lambda status, headers, exc_info=None: statuses.append(status),
+    )
+    try:
+        for _ in body:
+            if slow:
+                time.sleep(delay)
+    finally:
+        body.close()
+    return int(statuses[0].split()[0])
+
+
+async def serve_asgi(application, path, slow, delay):
+    """Запрос через ASGI: медленная отправка только приостанавливает задачу."""
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif slow:
+            await asyncio.sleep(delay)
+
+    await application(make_scope(path), receive, send)
+    return status
+
+
+class LoadStats:
+    """Задержки быстрых и медленных клиентов и ответы с ошибкой."""
+
+    def __init__(self):
+        self.latencies = {True: [], False: []}
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def add(self, slow, latency, status):
+        with self.lock:
+            self.latencies[slow].append(latency)
+            if status is None or status >= 500:
+                self.errors += 1
+
+    def as_dict(self, elapsed):
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            'requests': total,
+            'errors': self.errors,
+            'elapsed_s': elapsed,
+            'throughput_rps': total / elapsed if elapsed else None,
+            'fast_latency': get_latency_stats(self.latencies[False]),
+            'slow_latency': get_latency_stats(self.latencies[True]),
+        }
+
+
+def run_wsgi(paths, clients, slow_clients, requests, delay, workers):
+    application = WSGIHandler()
+    stats = LoadStats()
+
+    def client(number, pool):
+        slow = number < slow_clients
+        for index in range(requests):
+            path = paths[(number + index) % len(paths)]
+            start = time.perf_counter()
+            status = pool.submit(
+                serve_wsgi, application, path, slow, delay,
+            ).result()
+            stats.add(slow, time.perf_counter() - start, status)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        threads = [
+            threading.Thread(target=client, args=(number, pool))
+            for number in range(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return stats.as_dict(time.perf_counter() - started)
+
+
+def run_asgi(paths, clients, slow_clients, requests, delay):
+    stats = LoadStats()
+
+    async def client(application, number):
+        slow = number < slow_clients
+        for index in range(requests):
+            path = paths[(number + index) % len(paths)]
+            start = time.perf_counter()
+            status = await serve_asgi(application, path, slow, delay)
+            stats.add(slow, time.perf_counter() - start, status)
+
+    async def main():
+        application = ASGIHandler()
+        await asyncio.gather(*(
+            client(application, number) for number in range(clients)
+        ))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return stats.as_dict(time.perf_counter() - started)
+
+
+def run_load_test(clients=40, slow_clients=20, requests=5, delay=0.2,
+                  workers=4):
+    """Одинаковая нагрузка на WSGI с синхронными view и ASGI с асинхронными.
+
+    Кеш страниц отключён, чтобы каждый запрос доходил до view.
+    """
+    paths = get_load_paths()
+    options = {
+        'clients': clients,
+        'slow_clients': slow_clients,
+        'requests_per_client': requests,
+        'slow_delay_s': delay,
+    }
+    results = []
+    with override_settings(PAGE_CACHE_TIMEOUT=0):
+        with blog_views(use_async=False):
+            results.append({
+                'mode': 'wsgi',
+                'workers': workers,
+                **options,
+                **run_wsgi(
+                    paths, clients, slow_clients, requests, delay, workers,
+                ),
+            })
+        with blog_views(use_async=True):
+            results.append({
+                'mode': 'asgi',
+                **options,
+                **run_asgi(paths, clients, slow_clients, requests, delay),
+            })
+    return results
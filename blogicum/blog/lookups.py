@@ -0,0 +1,93 @@
+"""Кеш справочников Category и Location в памяти процесса.
+
+Таблицы маленькие и меняются редко, а читаются на каждой странице
+формы поста и ленты категории. Каждый процесс держит свою копию
+таблицы и сверяет её с номером версии в кеше Django: запись категории
+или места через сигналы увеличивает номер, и следующее чтение
+загружает таблицу заново одним запросом.
+
+Номер виден другим процессам, только если кеш у них общий, как
+memcached из комментария к settings.CACHES. Если номер до процесса
+не дошёл — кеш вытеснен или это LocMemCache, — копия всё равно
+перечитывается не реже раза в LOOKUP_CACHE_TIMEOUT секунд.
+
+Объекты из кеша общие для всех запросов процесса — их можно читать,
+но не изменять и не сохранять.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+from .models import Category
+
+LOOKUP_VERSION_KEY = 'lookups:version'
+
+_tables = {}
+
+
+class LookupTable:
+    """Строки справочника и ленивые индексы по полям."""
+
+    def __init__(self, version, objects):
+        self.version = version
+        self.objects = objects
+        self.loaded_at = time.monotonic()
+        self._indexes = {}
+
+    def get(self, field, value):
+        index = self._indexes.get(field)
+        if index is None:
+            index = self._indexes[field] = {
+                getattr(obj, field): obj for obj in self.objects
+            }
+        return index.get(value)
+
+
+def get_lookup_version():
+    """Номер версии справочников; как поколения в blog/cache.py."""
+    version = cache.get(LOOKUP_VERSION_KEY)
+    if version is None:
+        cache.add(LOOKUP_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(LOOKUP_VERSION_KEY)
+    return version
+
+
+def _bump_lookup_version():
+    try:
+        cache.incr(LOOKUP_VERSION_KEY)
+    except ValueError:
+        pass
+
+
+def bump_lookup_version():
+    """Сбрасывает справочники во всех процессах.
+
+    Номер увеличивается сразу — для текущего запроса — и ещё раз после
+    фиксации транзакции: другой процесс мог успеть загрузить таблицу
+    до фиксации и запомнить её под новым номером.
+    """
+    _bump_lookup_version()
+    transaction.on_commit(_bump_lookup_version)
+
+
+def get_lookup_table(model):
+    version = get_lookup_version()
+    table = _tables.get(model)
+    if table is None or table.version != version or (
+        time.monotonic() - table.loaded_at > settings.LOOKUP_CACHE_TIMEOUT
+    ):
+        table = _tables[model] = LookupTable(
+            version, list(model._default_manager.order_by('pk')),
+        )
+    return table
+
+
+def get_published_category_or_404(slug):
+    """Опубликованная категория по slug без запроса к базе."""
+    category = get_lookup_table(Category).get('slug', slug)
+    if category is None or not category.is_published:
+        raise Http404('Категория не найдена.')
+    return category
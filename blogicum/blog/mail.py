@@ -0,0 +1,57 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .jobs import enqueue
+
+
+def serialize_message(message):
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            return None
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append(
+            (filename, base64.b64encode(content).decode(), mimetype),
+        )
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': attachments,
+    }
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь фоновых задач вместо отправки в запросе.
+
+    Письма доставляет задача blog.tasks.send_email через
+    EMAIL_DELIVERY_BACKEND. Письма с MIME-вложениями, которые нельзя
+    сохранить в JSON, отправляются сразу.
+    """
+
+    def send_messages(self, email_messages):
+        sent = 0
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            serialized = serialize_message(message)
+            if serialized is None:
+                sent += get_connection(
+                    settings.EMAIL_DELIVERY_BACKEND,
+                    fail_silently=self.fail_silently,
+                ).send_messages([message])
+                continue
+            enqueue('blog.tasks.send_email', message=serialized)
+            sent += 1
+        return sent
@@ -0,0 +1,109 @@
+import json
+import platform
+import subprocess
+import sys
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from blog.benchmark import benchmark_database, run_benchmark
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'),
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_list(value, cast=str):
+    try:
+        return [cast(item) for item in value.split(',') if item]
+    except ValueError:
+        raise CommandError(f'Некорректный список: {value}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет отдельную тестовую базу сгенерированными данными и '
+        'замеряет пропускную способность и p50/p99 задержки всех '
+        'страниц blog/urls.py. Результат — JSON для сравнения коммитов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            default='100,1000',
+            help='Количества постов через запятую, по масштабу на прогон.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Запросов на каждую страницу после прогрева.',
+        )
+        parser.add_argument(
+            '--comments-per-post',
+            type=int,
+            default=5,
+        )
+        parser.add_argument(
+            '--roles',
+            default='guest',
+            help='guest и/или author через запятую.',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Сбрасывать кеш перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для JSON с результатами, «-» — stdout.',
+        )
+
+    def handle(self, *args, **options):
+        scales = parse_list(options['scales'], int)
+        roles = parse_list(options['roles'])
+        if set(roles) - {'guest', 'author'}:
+            raise CommandError('Роли: guest, author')
+        log = self.stderr.write if options['verbosity'] else None
+
+        with benchmark_database():
+            results = run_benchmark(
+                scales,
+                requests=options['requests'],
+                comments_per_post=options['comments_per_post'],
+                roles=roles,
+                cold=options['cold'],
+                log=log,
+            )
+
+        report = json.dumps({
+            'meta': {
+                'commit': get_git_commit(),
+                'created_at': timezone.now().isoformat(),
+                'python': sys.version.split()[0],
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'database': connection.vendor,
+                'requests': options['requests'],
+                'cold': options['cold'],
+            },
+            'results': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(report)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report + '\n')
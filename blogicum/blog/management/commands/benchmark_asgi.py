@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from blog.benchmark import benchmark_database, seed
+from blog.loadtest import run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает WSGI с синхронными view и ASGI с асинхронными под '
+        'нагрузкой, где часть клиентов медленно забирает ответ.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--clients', type=int, default=40)
+        parser.add_argument(
+            '--slow-clients',
+            type=int,
+            default=20,
+            help='Сколько из клиентов забирают ответ медленно.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=5,
+            help='Запросов от каждого клиента.',
+        )
+        parser.add_argument(
+            '--slow-delay',
+            type=float,
+            default=0.2,
+            help='Секунд на получение ответа медленным клиентом.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Потоков WSGI-сервера.',
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed(options['posts'])
+            results = run_load_test(
+                clients=options['clients'],
+                slow_clients=options['slow_clients'],
+                requests=options['requests'],
+                delay=options['slow_delay'],
+                workers=options['workers'],
+            )
+        self.stdout.write(json.dumps(results, indent=2))
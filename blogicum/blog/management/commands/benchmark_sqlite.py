@@ -0,0 +1,161 @@
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sqlite import apply_pragmas, is_locked_error
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, title TEXT, '
+    'pub_date REAL, comment_count INTEGER DEFAULT 0)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'text TEXT, created_at REAL)',
+    'CREATE INDEX comment_post ON comment (post_id, created_at)',
+)
+
+READ_SQL = (
+    'SELECT id, title, comment_count FROM post '
+    'ORDER BY pub_date DESC LIMIT 10 OFFSET ?'
+)
+
+
+def connect(path, tuned):
+    # Как Django: без неявных транзакций модуля sqlite3 и с таймаутом
+    # ожидания блокировки по умолчанию (5 секунд).
+    connection = sqlite3.connect(
+        path,
+        timeout=5,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    if tuned:
+        apply_pragmas(connection.cursor(), settings.SQLITE_PRAGMAS)
+    return connection
+
+
+def prepare(path, posts):
+    connection = sqlite3.connect(path, isolation_level=None)
+    for sql in SCHEMA:
+        connection.execute(sql)
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO post (title, pub_date) VALUES (?, ?)',
+        ((f'Пост {index}', index) for index in range(posts)),
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def reader(path, tuned, deadline, stats, posts):
+    connection = connect(path, tuned)
+    offset = 0
+    while time.monotonic() < deadline:
+        try:
+            connection.execute(READ_SQL, (offset,)).fetchall()
+            stats['reads'] += 1
+        except sqlite3.OperationalError as error:
+            if not is_locked_error(error):
+                raise
+            stats['read_errors'] += 1
+        offset = (offset + 10) % posts
+    connection.close()
+
+
+def writer(path, tuned, deadline, stats, posts):
+    # Запись комментария: вставка и обновление счётчика в одной
+    # транзакции, как в CommentCreateView с сигналами.
+    connection = connect(path, tuned)
+    post_id = 1
+    while time.monotonic() < deadline:
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'INSERT INTO comment (post_id, text, created_at) '
+                'VALUES (?, ?, ?)',
+                (post_id, 'Комментарий', time.time()),
+            )
+            connection.execute(
+                'UPDATE post SET comment_count = comment_count + 1 '
+                'WHERE id = ?',
+                (post_id,),
+            )
+            connection.execute('COMMIT')
+            stats['writes'] += 1
+        except sqlite3.OperationalError as error:
+            if not is_locked_error(error):
+                raise
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            stats['write_errors'] += 1
+        post_id = post_id % posts + 1
+    connection.close()
+
+
+def run(tuned, readers, writers, duration, posts):
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / 'bench.sqlite3')
+        prepare(path, posts)
+        deadline = time.monotonic() + duration
+        thread_stats = []
+        threads = []
+        for target, count in ((reader, readers), (writer, writers)):
+            for _ in range(count):
+                stats = dict.fromkeys(
+                    ('reads', 'read_errors', 'writes', 'write_errors'), 0,
+                )
+                thread_stats.append(stats)
+                threads.append(threading.Thread(
+                    target=target,
+                    args=(path, tuned, deadline, stats, posts),
+                ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    totals = {
+        key: sum(stats[key] for stats in thread_stats)
+        for key in thread_stats[0]
+    }
+    return {
+        'mode': 'tuned' if tuned else 'default',
+        **totals,
+        'reads_per_second': totals['reads'] / duration,
+        'writes_per_second': totals['writes'] / duration,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность параллельного чтения и записи '
+        'SQLite без настроек и с SQLITE_PRAGMAS (WAL и др.).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Секунд на каждый режим.',
+        )
+        parser.add_argument('--posts', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        results = [
+            run(
+                tuned,
+                options['readers'],
+                options['writers'],
+                options['duration'],
+                options['posts'],
+            )
+            for tuned in (False, True)
+        ]
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from blog.coldstart import run_startup_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает холодный старт процесса с прогревом шаблонов, '
+        'маршрутов и view и без него: запуск и первый запрос к каждой '
+        'странице блога в новом процессе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Процессов на каждый режим.',
+        )
+
+    def handle(self, *args, **options):
+        results = run_startup_benchmark(
+            posts=options['posts'], runs=options['runs'],
+        )
+        self.stdout.write(json.dumps(results, indent=2))
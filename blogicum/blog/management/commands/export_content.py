@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.content_dump import export_content, open_dump
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, категории, места, посты и комментарии '
+        'в JSON Lines, читая базу порциями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл выгрузки (*.gz — со сжатием), «-» — stdout.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Строк, читаемых из базы и записываемых за раз.',
+        )
+        parser.add_argument(
+            '--with-passwords',
+            action='store_true',
+            help='Выгрузить и хеши паролей пользователей.',
+        )
+
+    def handle(self, *args, **options):
+        export_options = {
+            'chunk_size': options['chunk_size'],
+            'with_passwords': options['with_passwords'],
+        }
+        if options['output'] == '-':
+            written = export_content(self.stdout, **export_options)
+        else:
+            with open_dump(options['output'], 'w') as file:
+                written = export_content(file, **export_options)
+        if options['verbosity']:
+            self.stderr.write(f'Выгружено строк: {written}')
@@ -0,0 +1,57 @@
+import sys
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.cache import bump_content_generation, invalidate_post_cards
+from blog.content_dump import ContentImportError, import_content, open_dump
+from blog.lookups import bump_lookup_version
+from blog.publication_clock import reset_publication_clock
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_content пачками bulk_create и '
+        'пересчитывает счётчики комментариев и постов и поисковый индекс.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл выгрузки (*.gz — со сжатием), «-» — stdin.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Объектов в одном bulk_create.',
+        )
+        parser.add_argument(
+            '--skip-rebuild',
+            action='store_true',
+            help='Не пересчитывать счётчики и поисковый индекс.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                stats = import_content(sys.stdin, options['batch_size'])
+            else:
+                with open_dump(options['path'], 'r') as file:
+                    stats = import_content(file, options['batch_size'])
+        except ContentImportError as error:
+            raise CommandError(str(error))
+
+        if not options['skip_rebuild']:
+            call_command('rebuild_comment_counts', stdout=StringIO())
+            call_command('rebuild_search_index', stdout=StringIO())
+            call_command('reconcile_post_counts', stdout=StringIO())
+        invalidate_post_cards()
+        bump_content_generation()
+        bump_lookup_version()
+        reset_publication_clock()
+
+        self.stdout.write(self.style.SUCCESS('Загружено: ' + ', '.join(
+            f'{row_type} — {count}' for row_type, count in stats.items()
+        )))
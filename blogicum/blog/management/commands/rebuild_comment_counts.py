@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики комментариев постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество постов, обновляемых за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        comments = Comment.objects.filter(
+            post=OuterRef('pk'),
+        ).order_by().values('post').annotate(
+            total=Count('pk'),
+        ).values('total')
+
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk).order_by(
+                    'pk',
+                ).values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += Post.objects.filter(pk__in=pks).update(
+                    comment_count=Coalesce(Subquery(comments), 0),
+                )
+            last_pk = pks[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано постов: {updated}'),
+        )
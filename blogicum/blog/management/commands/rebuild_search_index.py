@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_search_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов с нуля.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Количество постов, загружаемых из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс перестроен: {type(get_search_backend()).__name__}',
+        ))
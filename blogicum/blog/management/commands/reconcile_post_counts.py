@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.post_counts import reconcile_post_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет готовые числа опубликованных постов лент с базой и '
+        'исправляет расхождения. Запускается периодически, например cron.'
+    )
+
+    def handle(self, *args, **options):
+        fixed = reconcile_post_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков постов: {fixed}'),
+        )
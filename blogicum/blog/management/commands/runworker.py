@@ -0,0 +1,80 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog import worker
+from blog.jobs import claim_job, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди blog.Job.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=settings.JOBS_WORKER_PROCESSES,
+            help='Размер пула процессов; 0 — выполнять в текущем процессе.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, секунд.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить доступные задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            self.run_inline(options['poll_interval'], options['once'])
+        else:
+            self.run_pool(
+                options['processes'],
+                options['poll_interval'],
+                options['once'],
+            )
+
+    def run_inline(self, poll_interval, once):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write(f'Выполнено задач: {count}')
+            if once:
+                return
+            time.sleep(poll_interval)
+
+    def run_pool(self, processes, poll_interval, once):
+        # Соединения с базой не должны переходить в процессы пула.
+        connections.close_all()
+        running = set()
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=worker.init_worker,
+        ) as pool:
+            while True:
+                while len(running) < processes:
+                    pk = claim_job()
+                    if pk is None:
+                        break
+                    running.add(pool.submit(worker.execute_job, pk))
+                if not running:
+                    if once:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+                done, running = wait(
+                    running,
+                    timeout=poll_interval,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self.stdout.write(f'Задача завершена: {future.result()}')
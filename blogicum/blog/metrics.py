@@ -0,0 +1,226 @@
+"""Метрики запросов в памяти процесса: гистограммы и медленные запросы.
+
+MetricsMiddleware собирает по каждому запросу число SQL-запросов, время
+в базе, время отрисовки шаблонов и размер ответа. Гистограммы отдаются
+в текстовом формате Prometheus, медленные запросы вместе с их SQL
+хранятся в кольцевом буфере.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (
+    1024, 5 * 1024, 10 * 1024, 50 * 1024, 100 * 1024, 500 * 1024,
+    1024 * 1024,
+)
+
+HISTOGRAMS = (
+    # (имя, описание, границы корзин, поле RequestMetrics)
+    ('blog_request_duration_seconds', 'Время обработки запроса.',
+     DURATION_BUCKETS, 'duration'),
+    ('blog_request_queries', 'Число SQL-запросов за запрос.',
+     QUERY_BUCKETS, 'queries'),
+    ('blog_request_db_seconds', 'Время в базе данных за запрос.',
+     DURATION_BUCKETS, 'db_time'),
+    ('blog_request_template_seconds', 'Время отрисовки шаблонов.',
+     DURATION_BUCKETS, 'template_time'),
+    ('blog_response_size_bytes', 'Размер тела ответа.',
+     SIZE_BUCKETS, 'response_size'),
+)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса; SQL копится для выборки медленных."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.duration = 0.0
+        self.response_size = 0
+        self.sql = []
+        self._lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Параллельные запросы асинхронной view пишут из разных потоков.
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+                if len(self.sql) < settings.METRICS_SLOW_SQL_LIMIT:
+                    self.sql.append((sql, elapsed))
+
+
+def get_current_metrics():
+    return _current.get()
+
+
+def start_request_metrics():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request_metrics(token):
+    _current.reset(token)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, как в Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """Гистограммы по имени view и буфер медленных запросов процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {name: {} for name, *_ in HISTOGRAMS}
+            self.requests = {}
+            self.slow_requests = deque(
+                maxlen=settings.METRICS_SLOW_REQUESTS_LIMIT,
+            )
+
+    def observe(self, request, response, metrics):
+        match = request.resolver_match
+        view = match.view_name if match else ''
+        slow = metrics.duration >= settings.METRICS_SLOW_REQUEST_SECONDS
+        with self._lock:
+            for name, _, buckets, field in HISTOGRAMS:
+                histogram = self.histograms[name].get(view)
+                if histogram is None:
+                    histogram = self.histograms[name][view] = Histogram(
+                        buckets,
+                    )
+                histogram.observe(getattr(metrics, field))
+            key = (view, request.method, response.status_code)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if slow:
+                self.slow_requests.append({
+                    'time': time.time(),
+                    'method': request.method,
+                    'path': request.get_full_path(),
+                    'view': view,
+                    'status': response.status_code,
+                    'duration': metrics.duration,
+                    'queries': metrics.queries,
+                    'db_time': metrics.db_time,
+                    'template_time': metrics.template_time,
+                    'sql': list(metrics.sql),
+                })
+
+    def get_slow_requests(self):
+        with self._lock:
+            return list(self.slow_requests)
+
+    def render_prometheus(self):
+        with self._lock:
+            lines = [
+                '# HELP blog_requests_total Обработанные запросы.',
+                '# TYPE blog_requests_total counter',
+            ]
+            for (view, method, status), count in sorted(
+                self.requests.items(),
+            ):
+                labels = format_labels(view=view, method=method,
+                                       status=status)
+                lines.append(f'blog_requests_total{{{labels}}} {count}')
+            for name, help_text, _, _ in HISTOGRAMS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, histogram in sorted(self.histograms[name].items()):
+                    for bound, count in histogram.cumulative():
+                        labels = format_labels(view=view, le=bound)
+                        lines.append(f'{name}_bucket{{{labels}}} {count}')
+                    labels = format_labels(view=view)
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(
+                        f'{name}_count{{{labels}}} {sum(histogram.counts)}',
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+            '\n', r'\n',
+        )
+
+    return ','.join(
+        f'{name}="{escape(value)}"' for name, value in labels.items()
+    )
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentedTemplate(Template):
+    """Шаблон, время отрисовки которого попадает в метрики запроса.
+
+    Вложенные render_to_string (например, карточки постов) уже входят
+    во время внешнего шаблона и отдельно не считаются.
+    """
+
+    def render(self, context=None, request=None):
+        metrics = get_current_metrics()
+        if metrics is None:
+            return super().render(context, request)
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Бэкенд шаблонов Django, отдающий InstrumentedTemplate."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            self.engine.from_string(template_code), self,
+        )
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(
+                self.engine.get_template(template_name), self,
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+
+from .metrics import (finish_request_metrics, registry,
+                      start_request_metrics)
+from .query_wrappers import wrap_queries
+
+
+class MetricsMiddleware:
+    """Снимает метрики каждого запроса в blog.metrics.registry.
+
+    Работает и при DEBUG=False: SQL перехватывается через
+    execute_wrapper всех подключений, а не через connection.queries,
+    в том числе в потоках параллельных запросов асинхронных view.
+    Должна стоять первой, чтобы учитывать время остальных middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        metrics, token = start_request_metrics()
+        start = time.perf_counter()
+        try:
+            with wrap_queries(metrics.record_query):
+                response = self.get_response(request)
+        finally:
+            finish_request_metrics(token)
+        metrics.duration = time.perf_counter() - start
+        if not response.streaming:
+            metrics.response_size = len(response.content)
+        registry.observe(request, response, metrics)
+        return response
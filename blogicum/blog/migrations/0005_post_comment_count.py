@@ -0,0 +1,38 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:24
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    comments = Comment.objects.filter(
+        post=models.OuterRef('pk'),
+    ).order_by().values('post').annotate(
+        total=models.Count('pk'),
+    ).values('total')
+    Post.objects.update(
+        comment_count=Coalesce(
+            models.Subquery(comments), 0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_alter_comment_post_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(
+            fill_comment_count,
+            migrations.RunPython.noop,
+        ),
+    ]
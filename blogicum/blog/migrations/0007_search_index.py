@@ -0,0 +1,56 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:32
+
+from django.db import migrations, models
+import django.db
+import django.db.models.deletion
+
+
+def create_fts_table(apps, schema_editor):
+    # Без FTS5 поиск работает на инвертированном индексе SearchIndexEntry.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_search USING fts5('
+            'post_id UNINDEXED, title, text, category, comments, '
+            "tokenize = 'unicode61 remove_diacritics 0')"
+        )
+    except django.db.OperationalError:
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='blog.post', verbose_name='публикация')),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='blog.comment', verbose_name='комментарий')),
+            ],
+            options={
+                'verbose_name': 'запись поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=models.Index(fields=['term', 'post'], name='search_term_post_idx'),
+        ),
+        migrations.RunPython(
+            create_fts_table,
+            drop_fts_table,
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все посты'), ('category', 'Категория'), ('author', 'Автор')], max_length=16, verbose_name='Лента')),
+                ('object_id', models.PositiveIntegerField(default=0, verbose_name='id категории или автора')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Опубликованных постов')),
+                ('valid_until', models.DateTimeField(blank=True, null=True, verbose_name='Действует до')),
+            ],
+            options={
+                'verbose_name': 'счётчик постов',
+                'verbose_name_plural': 'Счётчики постов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'object_id'), name='post_counter_scope_unique'),
+        ),
+    ]
@@ -1,7 +1,6 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import Count
 from django.urls import reverse
 from django.utils import timezone
 
@@ -16,8 +15,6 @@ class OwnerPostManager(models.Manager):
             'location',
             'author',
             'category',
-        ).annotate(
-            comment_count=Count('comments'),
         ).order_by('-pub_date')
 
 
@@ -68,6 +65,14 @@ class Post(TitleModel, IsPublishedCreatedAt):
         upload_to=settings.FILE_PATH_UPLOAD_TO,
     )
 
+    # Денормализованный счётчик комментариев: поддерживается сигналами
+    # из blog/signals.py, пересчитывается командой rebuild_comment_counts.
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+
     objects = models.Manager()
     published_manager = PublishedPostManager()
     owner_manager = OwnerPostManager()
@@ -77,6 +82,26 @@ class Post(TitleModel, IsPublishedCreatedAt):
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
         default_related_name = 'posts'
+        indexes = (
+            # Общая лента: PublishedPostManager.
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            # Лента категории: CategoryPostsView.
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            # Лента автора: ProfileDetailView, в том числе для владельца.
+            # -id во всех индексах покрывает сортировку CursorPaginator.
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -87,6 +112,15 @@ class Post(TitleModel, IsPublishedCreatedAt):
             kwargs={'pk': self.pk},
         )
 
+    def is_visible(self):
+        """Повторяет фильтр PublishedPostManager для уже загруженного поста."""
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date <= timezone.now()
+        )
+
 
 class Category(TitleModel, IsPublishedCreatedAt):
 
@@ -151,12 +185,189 @@ class Comment(models.Model):
         ordering = (
             'created_at',
         )
+        indexes = (
+            # Страницы комментариев поста.
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_feed_idx',
+            ),
+        )
         default_related_name = 'comments'
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def get_absolute_url(self):
-        return reverse(
+        # Ссылка ведёт на страницу комментариев, где этот — последний.
+        url = reverse(
             'blog:post_detail',
-            kwargs={'pk': self.post.pk},
+            kwargs={'pk': self.post_id},
+        )
+        return f'{url}?comment={self.pk}#comment_{self.pk}'
+
+
+class PostCounter(models.Model):
+    """Готовое число опубликованных постов ленты для пагинатора.
+
+    Поддерживается сигналами из blog/signals.py, сверяется командой
+    reconcile_post_counts. valid_until — ближайшая отложенная публикация
+    в ленте: после неё число пересчитывается при первом чтении.
+    """
+
+    class Scope(models.TextChoices):
+        ALL = 'all', 'Все посты'
+        CATEGORY = 'category', 'Категория'
+        AUTHOR = 'author', 'Автор'
+
+    scope = models.CharField(
+        max_length=16,
+        choices=Scope.choices,
+        verbose_name='Лента',
+    )
+    object_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='id категории или автора',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Опубликованных постов',
+    )
+    valid_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Действует до',
+    )
+
+    class Meta:
+        verbose_name = 'счётчик постов'
+        verbose_name_plural = 'Счётчики постов'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('scope', 'object_id'),
+                name='post_counter_scope_unique',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id} = {self.count}'
+
+
+class SearchIndexEntry(models.Model):
+    """Запись инвертированного индекса: основа слова и её вес в посте.
+
+    Записи комментария хранятся отдельно от записей самого поста
+    и ссылаются на комментарий. Используется поиском, когда в SQLite
+    нет FTS5 или база не SQLite.
+    """
+
+    term = models.CharField(
+        max_length=64,
+        verbose_name='Основа слова',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_entries',
+        verbose_name='публикация',
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='search_entries',
+        verbose_name='комментарий',
+    )
+    weight = models.PositiveIntegerField(
+        verbose_name='Вес',
+    )
+
+    class Meta:
+        verbose_name = 'запись поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        indexes = (
+            models.Index(
+                fields=('term', 'post'),
+                name='search_term_post_idx',
+            ),
         )
+
+
+class Job(models.Model):
+    """Фоновая задача для manage.py runworker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    task = models.CharField(
+        max_length=128,
+        verbose_name='Задача',
+        help_text='Путь к функции задачи для импорта.',
+    )
+    key = models.CharField(
+        max_length=128,
+        blank=True,
+        verbose_name='Ключ',
+        help_text='Пока задача с этим ключом ждёт выполнения, '
+                  'такая же повторно не ставится.',
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name='Аргументы',
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5,
+        verbose_name='Максимум попыток',
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Не раньше',
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлена',
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершена',
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='job_queue_idx',
+            ),
+            models.Index(
+                fields=('key', 'status'),
+                name='job_key_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.task} ({self.get_status_display()})'
@@ -0,0 +1,184 @@
+import json
+from collections.abc import Mapping, Sequence
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage(Sequence):
+    """Страница, полученная по курсору (ключ сортировки, id)."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (key_field, id) без OFFSET и COUNT(*).
+
+    По умолчанию лента идёт по (-pub_date, -id); комментарии листаются
+    по (created_at, id) с descending=False.
+
+    Курсор — непрозрачный токен с ключом граничного объекта и направлением:
+    'n' — следующая страница, 'p' — предыдущая.
+    """
+
+    def __init__(self, object_list, per_page, key_field='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.key_field = key_field
+        self.descending = descending
+
+    def get_key(self, obj):
+        """Ключ (значение key_field, pk) модели или строки из .values()."""
+        if isinstance(obj, Mapping):
+            return obj[self.key_field], obj['pk']
+        return getattr(obj, self.key_field), obj.pk
+
+    def encode_cursor(self, obj, direction):
+        key, pk = self.get_key(obj)
+        return urlsafe_base64_encode(json.dumps(
+            [key.isoformat(), pk, direction],
+        ).encode())
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            key, pk, direction = json.loads(
+                urlsafe_base64_decode(cursor),
+            )
+            key = parse_datetime(key)
+        except (TypeError, ValueError):
+            raise InvalidCursor('Некорректный курсор страницы')
+        if (
+            key is None or not isinstance(pk, int)
+            or direction not in ('n', 'p')
+        ):
+            raise InvalidCursor('Некорректный курсор страницы')
+        return key, pk, direction
+
+    def get_ordered_queryset(self):
+        if self.descending:
+            return self.object_list.order_by(f'-{self.key_field}', '-pk')
+        return self.object_list.order_by(self.key_field, 'pk')
+
+    def _beyond(self, key, pk, forward, inclusive=False):
+        """Условие «после (key, pk)» в порядке ленты или «до» при обратном."""
+        lookup = 'lt' if self.descending == forward else 'gt'
+        pk_lookup = f'{lookup}e' if inclusive else lookup
+        return (
+            Q(**{f'{self.key_field}__{lookup}': key})
+            | Q(**{self.key_field: key, f'pk__{pk_lookup}': pk})
+        )
+
+    def page(self, cursor=None):
+        queryset = self.get_ordered_queryset()
+        if not cursor:
+            objects = list(queryset[:self.per_page + 1])
+            has_more, objects = (
+                len(objects) > self.per_page, objects[:self.per_page]
+            )
+            return self._build_page(objects, has_next=has_more,
+                                    has_previous=False)
+
+        key, pk, direction = self.decode_cursor(cursor)
+        if direction == 'n':
+            objects = list(queryset.filter(
+                self._beyond(key, pk, forward=True),
+            )[:self.per_page + 1])
+            has_more, objects = (
+                len(objects) > self.per_page, objects[:self.per_page]
+            )
+            return self._build_page(objects, has_next=has_more,
+                                    has_previous=True)
+
+        objects = list(queryset.reverse().filter(
+            self._beyond(key, pk, forward=False),
+        )[:self.per_page + 1])
+        has_more, objects = (
+            len(objects) > self.per_page, objects[:self.per_page]
+        )
+        return self._build_page(objects[::-1], has_next=True,
+                                has_previous=has_more)
+
+    def page_ending_at(self, obj):
+        """Страница, последним элементом которой является obj.
+
+        Нужна для ссылок на конкретный объект: новый комментарий
+        оказывается внизу страницы вместе с предшествующими ему.
+        """
+        key, pk = self.get_key(obj)
+        queryset = self.get_ordered_queryset()
+        objects = list(queryset.reverse().filter(
+            self._beyond(key, pk, forward=False, inclusive=True),
+        )[:self.per_page + 1])
+        has_more, objects = (
+            len(objects) > self.per_page, objects[:self.per_page]
+        )
+        has_next = queryset.filter(
+            self._beyond(key, pk, forward=True),
+        ).exists()
+        return self._build_page(objects[::-1], has_next=has_next,
+                                has_previous=has_more)
+
+    def _build_page(self, objects, has_next, has_previous):
+        return CursorPage(
+            objects,
+            self,
+            next_cursor=(
+                self.encode_cursor(objects[-1], 'n')
+                if has_next and objects else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(objects[0], 'p')
+                if has_previous and objects else None
+            ),
+        )
+
+
+class CountedPaginator(Paginator):
+    """Номерной пагинатор, берущий число объектов из готового счётчика.
+
+    get_count — функция без аргументов; если она вернула None, число
+    считается обычным COUNT(*) по object_list.
+    """
+
+    def __init__(self, object_list, per_page, get_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.get_count = get_count
+
+    @cached_property
+    def count(self):
+        count = self.get_count() if self.get_count else None
+        return super().count if count is None else count
@@ -0,0 +1,46 @@
+"""Часы публикаций: момент, когда отложенный пост появится в лентах.
+
+PublishedPostManager отбирает посты с pub_date <= now(), поэтому состав
+лент меняется со временем без всякой записи в базу. Кеши лент берут
+отсюда время ближайшей отложенной публикации и не живут дольше него.
+"""
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Post
+
+NEXT_PUBLICATION_KEY = 'publication_clock:next'
+LAST_PUBLICATION_KEY = 'publication_clock:last'
+NO_PUBLICATION = float('inf')
+
+
+def _find_next_publication():
+    pub_date = Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__gt=timezone.now(),
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    return pub_date.timestamp() if pub_date else NO_PUBLICATION
+
+
+def get_next_publication_timestamp():
+    """Время ближайшей отложенной публикации (Unix) или inf, если её нет."""
+    timestamp = cache.get(NEXT_PUBLICATION_KEY)
+    if timestamp is not None and timestamp <= time.time():
+        cache.set(LAST_PUBLICATION_KEY, timestamp, timeout=None)
+        timestamp = None
+    if timestamp is None:
+        timestamp = _find_next_publication()
+        cache.set(NEXT_PUBLICATION_KEY, timestamp, timeout=None)
+    return timestamp
+
+
+def get_last_publication_timestamp():
+    """Время последней вышедшей отложенной публикации или 0."""
+    return cache.get(LAST_PUBLICATION_KEY, 0)
+
+
+def reset_publication_clock():
+    cache.delete(NEXT_PUBLICATION_KEY)
@@ -0,0 +1,101 @@
+"""Защита от N+1: ловит запросы одной формы, повторённые в одном запросе.
+
+Форма запроса — его SQL без параметров, где списки IN (...) схлопнуты.
+Если одна форма встречается чаще QUERY_GUARD_THRESHOLD раз, скорее
+всего, шаблон обходит связанные объекты без select_related.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+
+from .query_wrappers import wrap_queries
+
+logger = logging.getLogger(__name__)
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class RepeatedQueriesError(Exception):
+    pass
+
+
+def get_query_shape(sql):
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryGuard:
+    """Контекстный менеджер, считающий формы SQL на всех подключениях.
+
+    Учитывает и запросы из потоков run_query() асинхронных view.
+
+    С action='raise' при выходе бросает RepeatedQueriesError,
+    с action='log' пишет предупреждение в лог blog.query_guard.
+    """
+
+    def __init__(self, threshold=None, action='raise', label=''):
+        self.threshold = (
+            settings.QUERY_GUARD_THRESHOLD if threshold is None else threshold
+        )
+        self.action = action
+        self.label = label
+        self.shapes = Counter()
+        self._lock = threading.Lock()
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        self._stack.enter_context(wrap_queries(self._record))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stack.close()
+        if exc_type is None:
+            self.check()
+
+    def _record(self, execute, sql, params, many, context):
+        with self._lock:
+            self.shapes[get_query_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def repeated(self):
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count > self.threshold
+        }
+
+    def check(self):
+        repeated = self.repeated
+        if not repeated:
+            return
+        message = '{}: повторяющиеся запросы:\n{}'.format(
+            self.label or 'QueryGuard',
+            '\n'.join(
+                f'{count} × {shape}' for shape, count in repeated.items()
+            ),
+        )
+        if self.action == 'raise':
+            raise RepeatedQueriesError(message)
+        logger.warning(message)
+
+
+class QueryGuardMiddleware:
+    """Проверяет каждый запрос на N+1 по settings.QUERY_GUARD.
+
+    'raise' — для тестов и стейджинга, 'log' — только предупреждение,
+    пустое значение отключает проверку.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_GUARD:
+            return self.get_response(request)
+        with QueryGuard(action=settings.QUERY_GUARD,
+                        label=f'{request.method} {request.path}'):
+            return self.get_response(request)
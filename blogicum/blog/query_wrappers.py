@@ -0,0 +1,40 @@
+"""Перехват SQL одного запроса во всех его потоках.
+
+execute_wrapper ставится на подключения потока, а у асинхронных view
+с ASYNC_VIEWS_PARALLEL_QUERIES запросы идут в потоках из пула со своими
+подключениями. Обёртки запроса хранятся в контекстной переменной:
+asgiref копирует контекст в поток пула, и run_query() ставит их там
+на подключения этого потока.
+"""
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+_wrappers = ContextVar('query_wrappers', default=())
+
+
+def _wrap_connections(stack, wrappers):
+    for connection in connections.all():
+        for wrapper in wrappers:
+            stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """execute_wrapper для подключений потока и потоков run_query()."""
+    token = _wrappers.set(_wrappers.get() + (wrapper,))
+    try:
+        with ExitStack() as stack:
+            _wrap_connections(stack, (wrapper,))
+            yield
+    finally:
+        _wrappers.reset(token)
+
+
+@contextmanager
+def inherited_query_wrappers():
+    """Ставит в потоке пула обёртки запроса, из которого он вызван."""
+    with ExitStack() as stack:
+        _wrap_connections(stack, _wrappers.get())
+        yield
@@ -0,0 +1,105 @@
+"""Чтение с реплик базы для запросов, которые ничего не пишут.
+
+ReplicaMiddleware разрешает чтение с реплик только безопасным запросам
+(GET, HEAD, OPTIONS) без куки-пина. Всё остальное — запись, команды
+manage.py, фоновый воркер — читает и пишет в основную базу.
+
+Реплики отстают от основной базы, поэтому после записи клиент получает
+куку REPLICA_PIN_COOKIE на REPLICA_PIN_SECONDS секунд и всё это время
+читает с основной базы: свой новый комментарий он увидит сразу.
+Записью клиента считается небезопасный метод или явный mark_written().
+Служебные записи безопасного запроса — задачи воркера, счётчики
+постов — идут в основную базу через роутер и клиента не пинят, иначе
+почти каждый анонимный читатель уходил бы с реплик.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_current = ContextVar('replica_state', default=None)
+
+
+class ReplicaState:
+    """Может ли текущий запрос читать с реплик и писал ли он в базу."""
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+def mark_written():
+    """Отмечает запись от имени клиента в безопасном запросе.
+
+    До конца запроса чтение идёт с основной базы, а клиент получает
+    куку-пин.
+    """
+    state = _current.get()
+    if state is not None:
+        state.use_replicas = False
+        state.wrote = True
+
+
+def get_replica_alias():
+    state = _current.get()
+    if (
+        state is None
+        or not state.use_replicas
+        or not settings.DATABASE_REPLICAS
+        # Открытая транзакция видит свои же изменения только на основной.
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+    ):
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    """Роутер: чтение — на случайную реплику, если можно, запись — на основную.
+
+    Реплики — копии основной базы, поэтому связи между объектами из
+    разных подключений разрешены, а миграции идут только на основную.
+    """
+
+    def db_for_read(self, model, **hints):
+        return get_replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплик для безопасных запросов без пина."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = ReplicaState(
+            request.method in SAFE_METHODS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        if settings.DATABASE_REPLICAS and (
+            state.wrote or request.method not in SAFE_METHODS
+        ):
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
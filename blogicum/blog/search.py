@@ -0,0 +1,301 @@
+"""Полнотекстовый поиск по постам, их категориям и комментариям.
+
+Если SQLite собран с FTS5, документы хранятся в виртуальной таблице
+blog_post_search и ранжируются через bm25(). Иначе используется
+инвертированный индекс на модели SearchIndexEntry с ранжированием
+tf-idf в Python. В оба индекса пишутся уже нормализованные основы
+слов из blog.stemming, поэтому запрос «книгами» находит «книги».
+
+Пост и каждый его комментарий — отдельные документы индекса с общим
+post_id: запись комментария индексирует только его текст, а не всё
+обсуждение. Пост находится, если каждое слово запроса есть в нём
+самом или в любом из его комментариев.
+
+Видимость постов проверяется в том же запросе к индексу, поэтому
+SEARCH_RESULTS_LIMIT считает только видимые посты.
+
+Индекс обновляется сигналами: изменения копятся в рамках транзакции
+и применяются после её фиксации, по одному разу на документ.
+"""
+import math
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Comment, Post, SearchIndexEntry
+from .stemming import tokenize
+
+FTS_TABLE = 'blog_post_search'
+FIELDS = ('title', 'text', 'category', 'comments')
+FIELD_WEIGHTS = {'title': 10, 'text': 1, 'category': 4, 'comments': 1}
+
+_pending = threading.local()
+_backends = {}
+
+
+def build_document(post):
+    """Основы слов поста по полям индекса, без комментариев."""
+    return {
+        'title': tokenize(post.title),
+        'text': tokenize(post.text),
+        'category': tokenize(post.category.title if post.category else ''),
+    }
+
+
+def build_comment_document(text):
+    return {'comments': tokenize(text)}
+
+
+class Fts5Backend:
+    """Строки FTS5: rowid поста — его pk, комментария — минус его pk.
+
+    Так обе строки удаляются по rowid, а post_id хранится
+    в неиндексируемом столбце для группировки выдачи.
+    """
+
+    def _write(self, rowid, post_pk, document):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [rowid],
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} '
+                f'(rowid, post_id, {", ".join(FIELDS)}) '
+                f'VALUES (%s, %s, {", ".join(["%s"] * len(FIELDS))})',
+                [
+                    rowid, post_pk,
+                    *(' '.join(document.get(field, ())) for field in FIELDS),
+                ],
+            )
+
+    def _remove(self, rowid):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [rowid],
+            )
+
+    def index(self, post_pk, document):
+        self._write(post_pk, post_pk, document)
+
+    def index_comment(self, comment_pk, post_pk, document):
+        self._write(-comment_pk, post_pk, document)
+
+    def remove(self, post_pk):
+        self._remove(post_pk)
+
+    def remove_comment(self, comment_pk):
+        self._remove(-comment_pk)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, terms, limit, visible):
+        # По MATCH на слово: слова поста могут быть в разных строках.
+        # Вес берётся из столбца rank: функцию bm25() SQLite не даёт
+        # вызвать, когда переносит подзапрос во внешний GROUP BY.
+        ranking = 'bm25(0, {})'.format(
+            ', '.join(str(FIELD_WEIGHTS[field]) for field in FIELDS),
+        )
+        visible_sql, visible_params = visible.query.sql_with_params()
+        matches = ' UNION ALL '.join(
+            f'SELECT post_id, {number} AS term, rank AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'AND rank MATCH %s AND post_id IN ({visible_sql})'
+            for number in range(len(terms))
+        )
+        params = []
+        for term in terms:
+            params += [f'"{term}"', ranking, *visible_params]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id FROM ({matches}) '
+                'GROUP BY post_id HAVING COUNT(DISTINCT term) = %s '
+                'ORDER BY SUM(score) LIMIT %s',
+                [*params, len(terms), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexBackend:
+    """Записи поста — с comment=NULL, комментария — с его comment_id."""
+
+    def _write(self, entries, post_pk, comment_pk, document):
+        weights = Counter()
+        for field, terms in document.items():
+            for term in terms:
+                weights[term[:64]] += FIELD_WEIGHTS[field]
+        with transaction.atomic():
+            entries.delete()
+            SearchIndexEntry.objects.bulk_create(
+                SearchIndexEntry(
+                    post_id=post_pk, comment_id=comment_pk,
+                    term=term, weight=weight,
+                )
+                for term, weight in weights.items()
+            )
+
+    def index(self, post_pk, document):
+        self._write(
+            SearchIndexEntry.objects.filter(
+                post_id=post_pk, comment__isnull=True,
+            ),
+            post_pk, None, document,
+        )
+
+    def index_comment(self, comment_pk, post_pk, document):
+        self._write(
+            SearchIndexEntry.objects.filter(comment_id=comment_pk),
+            post_pk, comment_pk, document,
+        )
+
+    def remove(self, post_pk):
+        SearchIndexEntry.objects.filter(post_id=post_pk).delete()
+
+    def remove_comment(self, comment_pk):
+        SearchIndexEntry.objects.filter(comment_id=comment_pk).delete()
+
+    def clear(self):
+        SearchIndexEntry.objects.all().delete()
+
+    def search(self, terms, limit, visible):
+        terms = {term[:64] for term in terms}
+        postings = defaultdict(Counter)
+        for term, post_pk, weight in SearchIndexEntry.objects.filter(
+            term__in=terms, post__in=visible,
+        ).values_list('term', 'post_id', 'weight').iterator():
+            postings[term][post_pk] += weight
+        if len(postings) < len(terms):
+            return []
+
+        total = Post.objects.count()
+        scores = defaultdict(float)
+        for term_postings in postings.values():
+            idf = math.log(1 + total / len(term_postings))
+            for post_pk, weight in term_postings.items():
+                scores[post_pk] += weight * idf
+        matched = set.intersection(
+            *(set(term_postings) for term_postings in postings.values())
+        )
+        return sorted(matched, key=lambda pk: -scores[pk])[:limit]
+
+
+def get_search_backend():
+    name = connection.settings_dict['NAME']
+    if name not in _backends:
+        _backends[name] = Fts5Backend() if (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        ) else InvertedIndexBackend()
+    return _backends[name]
+
+
+def index_post(post_pk):
+    post = Post.objects.select_related('category').filter(pk=post_pk).first()
+    if post is None:
+        get_search_backend().remove(post_pk)
+    else:
+        get_search_backend().index(post_pk, build_document(post))
+
+
+def index_comment(comment_pk):
+    comment = Comment.objects.filter(pk=comment_pk).values_list(
+        'post_id', 'text',
+    ).first()
+    if comment is None:
+        get_search_backend().remove_comment(comment_pk)
+    else:
+        post_pk, text = comment
+        get_search_backend().index_comment(
+            comment_pk, post_pk, build_comment_document(text),
+        )
+
+
+INDEXERS = {
+    'post': index_post,
+    'comment': index_comment,
+}
+
+
+def _is_flush_scheduled():
+    return any(
+        callback[1] is _flush_pending for callback in connection.run_on_commit
+    )
+
+
+def _schedule(kind, pk):
+    """Откладывает переиндексацию документа до фиксации транзакции.
+
+    Удаление категории или поста задевает много документов сразу,
+    а правка одного может прийти несколькими сигналами: без накопления
+    документ переиндексировался бы на каждый. Вне транзакции индекс
+    обновляется сразу.
+    """
+    if _is_flush_scheduled():
+        _pending.documents.add((kind, pk))
+        return
+    _pending.documents = {(kind, pk)}
+    transaction.on_commit(_flush_pending)
+
+
+def schedule_post_indexing(post_pk):
+    _schedule('post', post_pk)
+
+
+def schedule_comment_indexing(comment_pk):
+    _schedule('comment', comment_pk)
+
+
+def _flush_pending():
+    documents, _pending.documents = _pending.documents, set()
+    for kind, pk in documents:
+        INDEXERS[kind](pk)
+
+
+def rebuild_index(batch_size=500):
+    backend = get_search_backend()
+    backend.clear()
+    posts = Post.objects.select_related('category').order_by('pk')
+    for post in posts.iterator(chunk_size=batch_size):
+        backend.index(post.pk, build_document(post))
+    comments = Comment.objects.order_by('pk').values_list(
+        'pk', 'post_id', 'text',
+    )
+    for comment_pk, post_pk, text in comments.iterator(
+        chunk_size=batch_size,
+    ):
+        backend.index_comment(
+            comment_pk, post_pk, build_comment_document(text),
+        )
+
+
+def search_posts(query):
+    """Id видимых всем постов по запросу, от более релевантных."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    return get_search_backend().search(
+        terms,
+        settings.SEARCH_RESULTS_LIMIT,
+        Post.published_manager.order_by().values('pk'),
+    )
+
+
+class SearchResults(Sequence):
+    """Ленивая выдача: посты загружаются только для текущей страницы."""
+
+    def __init__(self, post_pks):
+        self.post_pks = post_pks
+
+    def __len__(self):
+        return len(self.post_pks)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        post_pks = self.post_pks[index]
+        posts = Post.published_manager.in_bulk(post_pks)
+        return [posts[pk] for pk in post_pks if pk in posts]
@@ -0,0 +1,218 @@
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .cache import (bump_content_generation, invalidate_post_card,
+                    invalidate_post_cards)
+from .jobs import enqueue
+from .lookups import bump_lookup_version
+from .models import Category, Comment, Location, Post, PostCounter
+from .post_counts import get_post_scopes, refresh_post_counts
+from .publication_clock import reset_publication_clock
+from .search import schedule_comment_indexing, schedule_post_indexing
+from .sqlite import configure_sqlite
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария."""
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста при удалении комментария.
+
+    Срабатывает и для удалений через админку и QuerySet.delete():
+    Collector отправляет post_delete для каждого удалённого объекта.
+    """
+    Post.objects.filter(
+        pk=instance.post_id,
+        comment_count__gt=0,
+    ).update(
+        comment_count=F('comment_count') - 1,
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_card_on_post_change(sender, instance, **kwargs):
+    invalidate_post_card(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_card_on_comment_change(sender, instance, **kwargs):
+    # В карточке выводится число комментариев.
+    invalidate_post_card(instance.post_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards_on_related_change(sender, **kwargs):
+    invalidate_post_cards()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_lookup_version_on_change(sender, **kwargs):
+    bump_lookup_version()
+
+
+@receiver(post_save, sender=User)
+def invalidate_caches_on_user_change(sender, update_fields=None, **kwargs):
+    # Вход в систему обновляет только last_login — на страницы не влияет.
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    invalidate_post_cards()
+    bump_content_generation()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_content_generation_on_change(sender, **kwargs):
+    # Сбрасывает кеш страниц для анонимных пользователей.
+    bump_content_generation()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_publication_clock_on_change(sender, **kwargs):
+    reset_publication_clock()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_search_index_on_post_change(sender, instance, raw=False,
+                                       **kwargs):
+    if not raw:
+        schedule_post_indexing(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_search_index_on_comment_change(sender, instance, raw=False,
+                                          **kwargs):
+    if not raw:
+        schedule_comment_indexing(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def update_search_index_on_category_change(sender, instance, raw=False,
+                                           **kwargs):
+    # При удалении категории посты переиндексируются после фиксации,
+    # когда у них уже обнулена ссылка на категорию.
+    if raw:
+        return
+    for post_pk in instance.posts.values_list('pk', flat=True):
+        schedule_post_indexing(post_pk)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_image(sender, instance, **kwargs):
+    # Отложенное поле не догружается: каждый пост из only()/defer()
+    # стоил бы запроса. Присвоенная потом картинка считается новой.
+    if 'image' in instance.get_deferred_fields():
+        instance._loaded_image_name = None
+        return
+    instance._loaded_image_name = instance.image.name
+
+
+@receiver(post_save, sender=Post)
+def generate_post_image_variants(sender, instance, raw=False, **kwargs):
+    # Отложенная картинка не записывалась и не менялась.
+    if (
+        raw
+        or 'image' in instance.get_deferred_fields()
+        or not instance.image
+    ):
+        return
+    if instance.image.name != instance._loaded_image_name:
+        enqueue(
+            'blog.tasks.generate_image_variants',
+            key=f'image_variants:{instance.pk}',
+            post_pk=instance.pk,
+        )
+    instance._loaded_image_name = instance.image.name
+
+
+@receiver(post_init, sender=Post)
+def remember_post_counter_scopes(sender, instance, **kwargs):
+    # Пост из only()/defer() не догружается ради сигнала: его прежние
+    # ленты при сохранении не пересчитаются, их поправит reconcile.
+    if {'category_id', 'author_id'} & instance.get_deferred_fields():
+        instance._loaded_counter_scopes = set()
+        return
+    instance._loaded_counter_scopes = get_post_scopes(
+        instance.category_id, instance.author_id,
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def refresh_post_counts_on_post_change(sender, instance, **kwargs):
+    # Пост мог уйти из старых категории или автора в новые.
+    refresh_post_counts(
+        instance._loaded_counter_scopes
+        | get_post_scopes(instance.category_id, instance.author_id),
+    )
+    instance._loaded_counter_scopes = get_post_scopes(
+        instance.category_id, instance.author_id,
+    )
+
+
+def get_category_author_ids(category):
+    return set(
+        category.posts.order_by().values_list(
+            'author_id', flat=True,
+        ).distinct(),
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_authors(sender, instance, **kwargs):
+    # После удаления у постов уже не будет ссылки на категорию.
+    instance._post_author_ids = get_category_author_ids(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_post_counts_on_category_change(sender, instance, created=False,
+                                           **kwargs):
+    # Публикация категории скрывает или открывает все её посты сразу.
+    if created:
+        return
+    author_ids = getattr(instance, '_post_author_ids', None)
+    if author_ids is None:
+        author_ids = get_category_author_ids(instance)
+    refresh_post_counts(
+        {(PostCounter.Scope.ALL, 0), (PostCounter.Scope.CATEGORY, instance.pk)}
+        | {(PostCounter.Scope.AUTHOR, pk) for pk in author_ids},
+    )
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        configure_sqlite(connection)
@@ -0,0 +1,68 @@
+"""Настройка подключений SQLite: WAL, PRAGMA и повтор при блокировке.
+
+В режиме WAL читатели не ждут писателя, synchronous=NORMAL в WAL не
+теряет целостность при сбое, mmap_size и cache_size держат горячие
+страницы в памяти. busy_timeout заставляет SQLite самому подождать
+занятую базу, а запрос вне транзакции, всё же получивший «database is
+locked», повторяется с экспоненциальной задержкой.
+"""
+import time
+
+from django.conf import settings
+from django.db import OperationalError
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(error):
+    return any(message in str(error) for message in LOCKED_MESSAGES)
+
+
+class RetryLockedQueries:
+    """execute_wrapper: повторяет запрос, упавший на блокировке базы.
+
+    Внутри транзакции повтор бессмыслен — снимок уже устарел, поэтому
+    ошибка отдаётся как есть и откатывает atomic().
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        delay = settings.SQLITE_LOCK_RETRY_DELAY
+        for _ in range(settings.SQLITE_LOCK_RETRIES):
+            try:
+                return execute(sql, params, many, context)
+            except OperationalError as error:
+                if self.connection.in_atomic_block or not is_locked_error(
+                    error,
+                ):
+                    raise
+            time.sleep(delay)
+            delay *= 2
+        return execute(sql, params, many, context)
+
+
+def configure_sqlite(connection):
+    """Настраивает только что открытое подключение SQLite."""
+    # Курсор драйвера, а не Django: PRAGMA не попадают в метрики
+    # и QueryGuard запроса, которому выпало открыть подключение.
+    cursor = connection.connection.cursor()
+    try:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
+    finally:
+        cursor.close()
+    # Обёртки живут на DatabaseWrapper и переживают переподключения.
+    # Подключение открывается лениво, часто внутри execute_wrapper()
+    # метрик или QueryGuard, а тот при выходе снимает последнюю обёртку
+    # стека. Повтор ставится в начало, куда эти pop() не достают.
+    if not any(
+        isinstance(wrapper, RetryLockedQueries)
+        for wrapper in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.insert(0, RetryLockedQueries(connection))
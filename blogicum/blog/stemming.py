@@ -0,0 +1,161 @@
+"""Нормализация и стемминг слов для поискового индекса.
+
+Стеммер — реализация алгоритма Snowball для русского языка
+(https://snowballstem.org/algorithms/russian/stemmer.html).
+Слова не на кириллице только приводятся к нижнему регистру.
+"""
+import re
+
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile(r'^[а-я]+$')
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ('ся', 'сь')
+VERB = (
+    (
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'ешь', 'нно',
+    ),
+    (
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+        'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+        'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    ),
+)
+NOUN = (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+)
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _longest(suffixes):
+    return sorted(suffixes, key=len, reverse=True)
+
+
+def _grouped(groups):
+    """Суффиксы первой группы допустимы только после «а» или «я»."""
+    return _longest(
+        [(suffix, True) for suffix in groups[0]]
+        + [(suffix, False) for suffix in groups[1]]
+    )
+
+
+PERFECTIVE_GERUND = _grouped(PERFECTIVE_GERUND)
+PARTICIPLE = _grouped(PARTICIPLE)
+VERB = _grouped(VERB)
+ADJECTIVE = _longest(ADJECTIVE)
+REFLEXIVE = _longest(REFLEXIVE)
+NOUN = _longest(NOUN)
+
+
+def _strip_grouped(word, suffixes):
+    for suffix, after_a in suffixes:
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            if not after_a or stem.endswith(('а', 'я')):
+                return stem
+    return None
+
+
+def _strip(word, suffixes):
+    for suffix in suffixes:
+        if word.endswith(suffix):
+            return word[:-len(suffix)]
+    return None
+
+
+def _region_start(word, start=0):
+    """Начало области после первой пары «гласная + согласная»."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _strip_adjectival(word):
+    stem = _strip(word, ADJECTIVE)
+    if stem is None:
+        return None
+    participle_stem = _strip_grouped(stem, PARTICIPLE)
+    return stem if participle_stem is None else participle_stem
+
+
+def _strip_inflection(rv):
+    """Шаг 1: окончания деепричастий, прилагательных, глаголов и имён."""
+    stripped = _strip_grouped(rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    reflexive = _strip(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    for strip_ending in (
+        _strip_adjectival,
+        lambda part: _strip_grouped(part, VERB),
+        lambda part: _strip(part, NOUN),
+    ):
+        stripped = strip_ending(rv)
+        if stripped is not None:
+            return stripped
+    return rv
+
+
+def _strip_tail(rv):
+    """Шаг 4: «нн», превосходная степень и мягкий знак."""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    superlative = _strip(rv, SUPERLATIVE)
+    if superlative is not None:
+        return superlative[:-1] if superlative.endswith('нн') else superlative
+    return rv[:-1] if rv.endswith('ь') else rv
+
+
+def stem(word):
+    """Возвращает основу русского слова."""
+    for index, letter in enumerate(word):
+        if letter in VOWELS:
+            rv_start = index + 1
+            break
+    else:
+        return word
+    prefix, rv = word[:rv_start], word[rv_start:]
+    r2_start = max(_region_start(word, _region_start(word) - 1) - rv_start, 0)
+
+    rv = _strip_inflection(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    derivational = _strip(rv[r2_start:], DERIVATIONAL)
+    if derivational is not None:
+        rv = rv[:r2_start] + derivational
+    return prefix + _strip_tail(rv)
+
+
+def normalize(word):
+    return word.lower().replace('ё', 'е')
+
+
+def tokenize(text):
+    """Разбивает текст на нормализованные основы слов."""
+    terms = []
+    for word in WORD_RE.findall(text or ''):
+        word = normalize(word)
+        if len(word) < 2:
+            continue
+        terms.append(stem(word) if CYRILLIC_RE.match(word) else word)
+    return terms
@@ -0,0 +1,39 @@
+"""Фоновые задачи блога для очереди из blog.jobs."""
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .cache import bump_content_generation, invalidate_post_card
+from .images import generate_variants
+from .models import Post
+
+
+def generate_image_variants(post_pk):
+    post = Post.objects.filter(pk=post_pk).first()
+    if post is None or not post.image:
+        return
+    generate_variants(post.image)
+    # Карточки и страницы с оригиналом картинки перерисовываются.
+    # Задача идёт в процессе runworker: до веб-процессов сброс доходит,
+    # только если кеш общий (см. CACHES в settings).
+    invalidate_post_card(post_pk)
+    bump_content_generation()
+
+
+def send_email(message):
+    email = EmailMultiAlternatives(
+        subject=message['subject'],
+        body=message['body'],
+        from_email=message['from_email'],
+        to=message['to'],
+        cc=message['cc'],
+        bcc=message['bcc'],
+        reply_to=message['reply_to'],
+        headers=message['headers'],
+        alternatives=[tuple(item) for item in message['alternatives']],
+        connection=get_connection(settings.EMAIL_DELIVERY_BACKEND),
+    )
+    for filename, content, mimetype in message['attachments']:
+        email.attach(filename, base64.b64decode(content), mimetype)
+    email.send()
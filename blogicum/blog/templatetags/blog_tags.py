@@ -0,0 +1,69 @@
+from collections import namedtuple
+
+from django import template
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+from blog.cache import render_post_cards
+from blog.images import get_srcsets, get_variant_url, has_variants
+from blog.jobs import enqueue
+
+register = template.Library()
+
+PageLink = namedtuple('PageLink', ('number', 'url', 'is_current'))
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Отрисованные карточки постов страницы ленты из кеша фрагментов."""
+    return [mark_safe(card) for card in render_post_cards(posts)]
+
+
+@register.simple_tag
+def page_links(page, query_prefix=''):
+    """Номера страниц для пагинатора: окно вокруг текущей и края.
+
+    Выводятся PAGINATOR_ON_ENDS первых и последних страниц и
+    PAGINATOR_ON_EACH_SIDE по обе стороны от текущей, пропуски
+    заменяет многоточие с url=None. Префикс ссылок собирается один раз.
+    """
+    prefix = f'?{query_prefix}page='
+    ellipsis = page.paginator.ELLIPSIS
+    return [
+        PageLink(
+            number,
+            None if number == ellipsis else f'{prefix}{number}',
+            number == page.number,
+        )
+        for number in page.paginator.get_elided_page_range(
+            page.number,
+            on_each_side=settings.PAGINATOR_ON_EACH_SIDE,
+            on_ends=settings.PAGINATOR_ON_ENDS,
+        )
+    ]
+
+
+@register.inclusion_tag('includes/post_image.html', takes_context=True)
+def post_image(context, post, sizes='(max-width: 640px) 100vw, 640px'):
+    """Картинка поста с srcset из уменьшенных копий и WebP.
+
+    Если копий ещё нет, выводится оригинал, а их создание ставится
+    в очередь фоновых задач. Для карточек ленты это уже сделал
+    render_post_cards() одной пачкой на страницу.
+    """
+    image = post.image
+    if not has_variants(image):
+        if context.get('variants_queued'):
+            return {'image': image, 'src': image.url}
+        enqueue(
+            'blog.tasks.generate_image_variants',
+            key=f'image_variants:{post.pk}',
+            post_pk=post.pk,
+        )
+        return {'image': image, 'src': image.url}
+    return {
+        'image': image,
+        'src': get_variant_url(image, settings.POST_IMAGE_WIDTHS[0]),
+        'srcsets': get_srcsets(image),
+        'sizes': sizes,
+    }
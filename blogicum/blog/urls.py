@@ -1,21 +1,31 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, feeds, views
+
+# Под ASGI (blogicum.settings_asgi) ленты и пост отдаются асинхронно.
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 app_name = 'blog'
 urlpatterns = [
 
     path(
         '',
-        views.PostListView.as_view(),
+        read_views.PostListView.as_view(),
         name='index',
     ),
 
     path(
         'posts/<int:pk>/',
-        views.PostDetailView.as_view(),
+        read_views.PostDetailView.as_view(),
         name='post_detail'),
 
+    path(
+        'posts/<int:pk>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments',
+    ),
+
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -36,10 +46,88 @@ urlpatterns = [
 
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPostsView.as_view(),
+        read_views.CategoryPostsView.as_view(),
         name='category_posts',
     ),
 
+    path(
+        'search/',
+        views.SearchView.as_view(),
+        name='search',
+    ),
+
+    path(
+        'feeds/rss/',
+        feeds.LatestPostsFeed(),
+        name='feed',
+    ),
+
+    path(
+        'feeds/atom/',
+        feeds.LatestPostsAtomFeed(),
+        name='feed_atom',
+    ),
+
+    path(
+        'feeds/category/<slug:category_slug>/rss/',
+        feeds.CategoryPostsFeed(),
+        name='category_feed',
+    ),
+
+    path(
+        'feeds/category/<slug:category_slug>/atom/',
+        feeds.CategoryPostsAtomFeed(),
+        name='category_feed_atom',
+    ),
+
+    path(
+        'feeds/profile/<username>/rss/',
+        feeds.ProfilePostsFeed(),
+        name='profile_feed',
+    ),
+
+    path(
+        'feeds/profile/<username>/atom/',
+        feeds.ProfilePostsAtomFeed(),
+        name='profile_feed_atom',
+    ),
+
+    path(
+        'api/posts/',
+        api.PostListApiView.as_view(),
+        name='api_index',
+    ),
+
+    path(
+        'api/posts/<int:pk>/',
+        api.PostDetailApiView.as_view(),
+        name='api_post_detail',
+    ),
+
+    path(
+        'api/category/<slug:category_slug>/',
+        api.CategoryPostsApiView.as_view(),
+        name='api_category_posts',
+    ),
+
+    path(
+        'api/profile/<username>/',
+        api.ProfileApiView.as_view(),
+        name='api_profile',
+    ),
+
+    path(
+        'metrics/',
+        views.MetricsView.as_view(),
+        name='metrics',
+    ),
+
+    path(
+        'metrics/slow/',
+        views.SlowRequestsView.as_view(),
+        name='slow_requests',
+    ),
+
     path(
         'profile/edit/',
         views.ProfileUpdateView.as_view(),
@@ -48,7 +136,7 @@ urlpatterns = [
 
     path(
         'profile/<username>/',
-        views.ProfileDetailView.as_view(),
+        read_views.ProfileDetailView.as_view(),
         name='profile',
     ),
 
@@ -1,15 +1,26 @@
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import Http404, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy
+from django.utils.http import urlencode
 from django.utils import timezone
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  UpdateView, View)
 
+from .cache import get_or_render_page, is_page_cacheable
+from .conditional import content_condition
 from .forms import CommentForm, PostForm, ProfileEditForm
-from .models import Category, Comment, Post
+from .lookups import get_published_category_or_404
+from .metrics import registry
+from .models import Comment, Post, PostCounter
+from .pagination import CountedPaginator, CursorPaginator, InvalidCursor
+from .post_counts import get_published_post_count
+from .search import SearchResults, search_posts
 
 User = get_user_model()
 
@@ -50,6 +61,114 @@ class CheckUserMixin:
         return self.render_to_response(self.get_context_data())
 
 
+class PostPaginationMixin:
+    """Выбирает режим пагинации лент по settings.POSTS_PAGINATION."""
+
+    paginate_by = settings.POSTS_LIMIT
+    cursor_kwarg = 'cursor'
+
+    def get_post_count(self):
+        """Готовое число постов ленты или None, чтобы посчитать COUNT(*)."""
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return CountedPaginator(
+            queryset, per_page, get_count=self.get_post_count, **kwargs,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if settings.POSTS_PAGINATION != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+        page = self.get_cursor_page(queryset, page_size)
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+    def get_cursor_page(self, queryset, page_size):
+        try:
+            return CursorPaginator(queryset, page_size).page(
+                self.request.GET.get(self.cursor_kwarg),
+            )
+        except InvalidCursor as error:
+            raise Http404(str(error))
+
+
+class VisiblePostMixin:
+    """Отдаёт пост автору всегда, остальным — только опубликованный."""
+
+    model = Post
+    queryset = Post.owner_manager.all()
+
+    def get_object(self, queryset=None):
+        # Пост загружается одним запросом, а видимость для не-автора
+        # проверяется уже в Python.
+        post = super().get_object(queryset)
+        if post.author != self.request.user and not post.is_visible():
+            raise Http404('Публикация не найдена')
+        return post
+
+
+class CommentPaginationMixin:
+    """Листает комментарии поста по (created_at, id) от старых к новым.
+
+    Параметр anchor_kwarg открывает страницу, заканчивающуюся нужным
+    комментарием, — на неё ведёт Comment.get_absolute_url().
+    """
+
+    comments_cursor_kwarg = 'comments_cursor'
+    anchor_kwarg = 'comment'
+
+    def get_comments_page(self, post):
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            settings.COMMENTS_LIMIT,
+            key_field='created_at',
+            descending=False,
+        )
+        anchor = self.request.GET.get(self.anchor_kwarg, '')
+        comment = anchor.isdigit() and post.comments.filter(
+            pk=anchor,
+        ).first()
+        if comment:
+            return paginator.page_ending_at(comment)
+        try:
+            return paginator.page(
+                self.request.GET.get(self.comments_cursor_kwarg),
+            )
+        except InvalidCursor as error:
+            raise Http404(str(error))
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на условный GET, пока контент сайта не изменился.
+
+    Валидаторы общие для всех страниц, как в API: ETag — поколение
+    контента, Last-Modified — последняя запись постов и комментариев
+    или выход отложенной публикации. Любая запись сдвигает их на каждой
+    странице, зато проверка не стоит запросов к базе, а правки и
+    удаления не оставляют устаревший 304.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        return content_condition(super().dispatch)(request, *args, **kwargs)
+
+
+class AnonymousPageCacheMixin:
+    """Кеширует целые страницы для анонимных GET-запросов."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+        return get_or_render_page(
+            request,
+            partial(super().dispatch, request, *args, **kwargs),
+        )
+
+
+class StaffRequiredMixin(UserPassesTestMixin):
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+
 class SuccessUrlMixin:
 
     def get_success_url(self):
@@ -66,30 +185,68 @@ class SuccessUrlMixin:
 # ------------------------------------------------------------
 
 
-class PostListView(ListView):
+class PostListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/index.html'
-    paginate_by = settings.POSTS_LIMIT
-    queryset = Post.published_manager.all()
 
+    def get_queryset(self):
+        # Фильтр по pub_date__lte=now() должен вычисляться на каждый запрос,
+        # а не один раз при импорте модуля.
+        return self.model.published_manager.all()
 
-class PostDetailView(DetailView):
-    model = Post
-    template_name = 'blog/detail.html'
+    def get_post_count(self):
+        return get_published_post_count(PostCounter.Scope.ALL)
 
-    def get_queryset(self):
-        return self.model.owner_manager.all() if (
-            self.get_object(self.model.objects).author == self.request.user
-        ) else self.model.published_manager.all()
+
+class PostDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, VisiblePostMixin,
+    CommentPaginationMixin, DetailView,
+):
+    template_name = 'blog/detail.html'
 
     def get_context_data(self, **kwargs):
         return dict(
             **super().get_context_data(**kwargs),
             form=CommentForm(),
-            comments=self.object.comments.select_related('author'),
+            comments=self.get_comments_page(self.object),
         )
 
 
+class PostCommentsView(
+    AnonymousPageCacheMixin, VisiblePostMixin, CommentPaginationMixin,
+    DetailView,
+):
+    """Следующие страницы комментариев для подгрузки без перезагрузки.
+
+    Отдаёт HTML-фрагмент, а с ?format=json — тот же фрагмент вместе
+    с курсорами соседних страниц.
+    """
+
+    template_name = 'includes/comment_list.html'
+    comments_cursor_kwarg = 'cursor'
+
+    def get_context_data(self, **kwargs):
+        return dict(
+            **super().get_context_data(**kwargs),
+            comments=self.get_comments_page(self.object),
+        )
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') != 'json':
+            return super().render_to_response(context, **response_kwargs)
+        comments = context['comments']
+        return JsonResponse({
+            'html': render_to_string(
+                self.template_name, context, self.request,
+            ),
+            'next_cursor': comments.next_cursor,
+            'previous_cursor': comments.previous_cursor,
+        })
+
+
 class PostCreateView(
     LoginRequiredMixin, SuccessUrlMixin, ModelFormPostMixin, CreateView,
 ):
@@ -117,16 +274,24 @@ class PostDeleteView(
         )
 
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostPaginationMixin,
+    ListView,
+):
     template_name = 'blog/category.html'
-    paginate_by = settings.POSTS_LIMIT
     category = None
 
+    def get_post_count(self):
+        category = self.category or get_published_category_or_404(
+            self.kwargs['category_slug'],
+        )
+        return get_published_post_count(
+            PostCounter.Scope.CATEGORY, category.pk,
+        )
+
     def get_queryset(self):
-        self.category = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True,
+        self.category = get_published_category_or_404(
+            self.kwargs['category_slug'],
         )
 
         return self.category.posts(
@@ -140,13 +305,25 @@ class CategoryPostsView(ListView):
         )
 
 
-class ProfileDetailView(DetailView):
+class ProfileDetailView(ConditionalGetMixin, PostPaginationMixin, DetailView):
     model = User
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
-    paginate_by = settings.POSTS_LIMIT
     slug_field = 'username'
     slug_url_kwarg = 'username'
+    object = None
+
+    def is_owner(self):
+        return self.request.user.get_username() == self.kwargs['username']
+
+    def get_post_count(self):
+        # Владелец видит и неопубликованные посты: их число не хранится.
+        if self.is_owner():
+            return None
+        author = self.object or get_object_or_404(
+            User, username=self.kwargs['username'],
+        )
+        return get_published_post_count(PostCounter.Scope.AUTHOR, author.pk)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -156,7 +333,14 @@ class ProfileDetailView(DetailView):
             ) else 'published_manager'
         ).all()
 
-        paginator = Paginator(
+        if settings.POSTS_PAGINATION == 'cursor':
+            context['page_obj'] = self.get_cursor_page(
+                posts,
+                self.paginate_by,
+            )
+            return context
+
+        paginator = self.get_paginator(
             posts,
             self.paginate_by,
         )
@@ -167,6 +351,23 @@ class ProfileDetailView(DetailView):
         return context
 
 
+class SearchView(ListView):
+    template_name = 'blog/search.html'
+    paginate_by = settings.POSTS_LIMIT
+    query = ''
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return SearchResults(search_posts(self.query))
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        return dict(
+            **super().get_context_data(**kwargs),
+            query=self.query,
+            query_prefix=urlencode({'q': self.query}) + '&',
+        )
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     form_class = ProfileEditForm
@@ -209,4 +410,21 @@ class CommentDeleteView(
 ):
 
     def get_success_url(self):
-        return self.object.get_absolute_url()
+        return self.object.post.get_absolute_url()
+
+
+class MetricsView(StaffRequiredMixin, View):
+    """Метрики процесса в текстовом формате Prometheus."""
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            registry.render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class SlowRequestsView(StaffRequiredMixin, View):
+    """Последние медленные запросы процесса вместе с их SQL."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({'requests': registry.get_slow_requests()})
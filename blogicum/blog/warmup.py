@@ -0,0 +1,110 @@
+"""Прогрев процесса при запуске, чтобы первый запрос не платил за него.
+
+Без прогрева первый запрос после деплоя или перезапуска воркера
+импортирует URLconf и модули view, строит таблицы reverse() и
+компилирует каждый шаблон страницы. Здесь это делается заранее из
+wsgi.py и asgi.py, то есть только в процессах, которые отдают
+страницы: команды manage.py и процессы runworker за прогрев не платят.
+Скомпилированные шаблоны остаются в cached.Loader из settings.TEMPLATES
+и достаются следующим запросам без разбора.
+"""
+import logging
+import time
+from importlib import import_module
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+from django.utils.module_loading import module_has_submodule
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+
+def import_view_modules():
+    """Импортирует views каждого приложения; возвращает их число."""
+    count = 0
+    for app_config in apps.get_app_configs():
+        if module_has_submodule(app_config.module, 'views'):
+            import_module(f'{app_config.name}.views')
+            count += 1
+    return count
+
+
+def warm_urls():
+    """Заполняет таблицы reverse() корневого URLconf и всех пространств имён.
+
+    Обращение к reverse_dict импортирует URLconf вместе с view, которые
+    он подключает. Возвращает число именованных маршрутов.
+    """
+    resolvers = [get_resolver()]
+    count = 0
+    while resolvers:
+        resolver = resolvers.pop()
+        count += sum(isinstance(key, str) for key in resolver.reverse_dict)
+        resolvers.extend(
+            namespace[1] for namespace in resolver.namespace_dict.values()
+        )
+    return count
+
+
+def get_template_dirs(backend):
+    dirs = [Path(directory) for directory in backend.engine.dirs]
+    for app_label in settings.TEMPLATE_WARMUP_APPS:
+        dirs.append(Path(apps.get_app_config(app_label).path) / 'templates')
+    return dirs
+
+
+def get_template_names(directory):
+    return [
+        path.relative_to(directory).as_posix()
+        for path in sorted(directory.rglob('*'))
+        if path.suffix in TEMPLATE_SUFFIXES and path.is_file()
+    ]
+
+
+def warm_templates():
+    """Компилирует шаблоны в кеш загрузчиков; возвращает их число.
+
+    Шаблон с ошибкой только попадает в журнал: запуск он не ломает,
+    а его страница ответит ошибкой, как и без прогрева.
+    """
+    count = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for directory in get_template_dirs(backend):
+            for name in get_template_names(directory):
+                try:
+                    backend.engine.get_template(name)
+                except TemplateSyntaxError as error:
+                    logger.warning('Шаблон %s не собран: %s', name, error)
+                else:
+                    count += 1
+    return count
+
+
+def warm_up():
+    """Прогревает view, маршруты и шаблоны; возвращает сводку."""
+    started = time.perf_counter()
+    stats = {
+        'views': import_view_modules(),
+        'urls': warm_urls(),
+        'templates': warm_templates(),
+    }
+    stats['elapsed_s'] = time.perf_counter() - started
+    logger.info(
+        'Прогрев: модулей view %(views)d, маршрутов %(urls)d, '
+        'шаблонов %(templates)d за %(elapsed_s).3f с', stats,
+    )
+    return stats
+
+
+def warm_up_server():
+    """Прогрев из wsgi.py и asgi.py, если включён TEMPLATE_WARMUP."""
+    if settings.TEMPLATE_WARMUP:
+        warm_up()
@@ -0,0 +1,16 @@
+"""Точки входа для процессов пула manage.py runworker.
+
+Модуль не импортирует модели на верхнем уровне: процессы пула
+запускаются через spawn и настраивают Django сами в init_worker().
+"""
+import django
+
+
+def init_worker():
+    django.setup()
+
+
+def execute_job(pk):
+    from .jobs import execute_job
+
+    return execute_job(pk)
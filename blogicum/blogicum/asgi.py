@@ -2,6 +2,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+from blog.warmup import warm_up_server
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings_asgi')
 
 application = get_asgi_application()
+
+warm_up_server()
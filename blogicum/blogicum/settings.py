@@ -29,6 +29,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.MetricsMiddleware',
+    'blog.query_guard.QueryGuardMiddleware',
+    'blog.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -45,10 +48,19 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blog.metrics.InstrumentedDjangoTemplates',
+        # Без NAME алиас берётся из пути бэкенда — 'metrics'.
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Скомпилированные шаблоны живут в памяти процесса и при
+            # DEBUG: в 3.2 runserver сбрасывает кеш при правке шаблона.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -59,12 +71,77 @@ TEMPLATES = [
     },
 ]
 
+# debug_toolbar ищет app_directories.Loader только на верхнем уровне
+# loaders и не видит его внутри cached.Loader.
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Подключение переиспользуется между запросами одного потока.
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            # Сколько секунд ждать занятую другим писателем базу.
+            'timeout': 5,
+        },
+    }
+}
+
+# Псевдонимы реплик из DATABASES для чтения (см. blog/replicas.py).
+# Локально реплика — копия основной базы SQLite, её обновляет
+# manage.py sync_replicas:
+#
+# DATABASES['replica'] = {
+#     **DATABASES['default'],
+#     'NAME': BASE_DIR / 'db.replica.sqlite3',
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['blog.replicas.ReplicaRouter']
+
+# После записи клиент столько секунд читает с основной базы.
+REPLICA_PIN_SECONDS = 10
+
+REPLICA_PIN_COOKIE = 'db_primary'
+
+# Применяются к каждому новому подключению SQLite (см. blog/sqlite.py).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_LOCK_RETRIES = 3
+
+SQLITE_LOCK_RETRY_DELAY = 0.05
+
+# Через кеш расходятся поколения карточек и страниц, версия
+# справочников и часы публикаций. LocMemCache живёт в памяти процесса:
+# сброс из одного воркера или runworker другие процессы не видят, пока
+# не истечёт таймаут записи (справочники — LOOKUP_CACHE_TIMEOUT).
+# Этого хватает для runserver и тестов. Для нескольких процессов
+# нужен общий кеш в памяти, например memcached (pip install pymemcache):
+#
+# CACHES['default'] = {
+#     'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+#     'LOCATION': '127.0.0.1:11211',
+# }
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            # Карточки, страницы, ленты и ключи Last-Modified делят этот
+            # лимит; при переполнении удаляется треть записей.
+            'MAX_ENTRIES': 5000,
+        },
     }
 }
 
@@ -107,14 +184,88 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 POSTS_LIMIT = 10
 
+# Номерной пагинатор показывает столько страниц по краям и по обе
+# стороны от текущей, остальные заменяет многоточием.
+PAGINATOR_ON_ENDS = 1
+
+PAGINATOR_ON_EACH_SIDE = 3
+
+# 'numbered' — страницы с номерами, 'cursor' — keyset-пагинация по курсору.
+POSTS_PAGINATION = 'numbered'
+
+# Комментарии под постом листаются курсором по (created_at, id).
+COMMENTS_LIMIT = 50
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Категории и места в памяти процесса перечитываются не реже, чем раз
+# в столько секунд, даже если сброс из другого процесса не дошёл.
+LOOKUP_CACHE_TIMEOUT = 60
+
+# Кеш страниц для анонимных пользователей: 0 отключает его.
+PAGE_CACHE_TIMEOUT = 60
+
+PAGE_CACHE_STALE_TIMEOUT = 30
+
+SEARCH_RESULTS_LIMIT = 1000
+
+# Асинхронные ленты и страница поста из blog/async_views.py.
+# Включаются профилем blogicum.settings_asgi.
+ASYNC_VIEWS = False
+
+# Запросы асинхронной страницы идут параллельно в разных подключениях.
+ASYNC_VIEWS_PARALLEL_QUERIES = True
+
+# Прогрев при запуске веб-процесса (wsgi.py, asgi.py) из blog/warmup.py:
+# шаблоны из DIRS и приложений TEMPLATE_WARMUP_APPS, маршруты и view.
+TEMPLATE_WARMUP = True
+
+TEMPLATE_WARMUP_APPS = ['django_bootstrap5']
+
+FEED_ITEMS_LIMIT = 20
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Метрики запросов в памяти процесса, отдаются администраторам по /metrics.
+METRICS_ENABLED = True
+
+METRICS_SLOW_REQUEST_SECONDS = 0.5
+
+METRICS_SLOW_REQUESTS_LIMIT = 50
+
+METRICS_SLOW_SQL_LIMIT = 100
+
+# Проверка N+1: 'raise', 'log' или None. В тестах включена на 'raise'.
+QUERY_GUARD = None
+
+QUERY_GUARD_THRESHOLD = 3
+
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 LOGIN_URL = 'login'
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь фоновых задач и доставляются runworker
+# через EMAIL_DELIVERY_BACKEND.
+EMAIL_BACKEND = 'blog.mail.QueuedEmailBackend'
+
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 FILE_PATH_UPLOAD_TO = 'posts_images/%Y/%m/%d/'
+
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+POST_IMAGE_QUALITY = 80
+
+JOBS_WORKER_PROCESSES = 2
+
+JOBS_POLL_INTERVAL = 1.0
+
+JOBS_CLAIM_BATCH = 10
+
+JOBS_RETRY_DELAY = 30
+
+JOBS_LOCK_TIMEOUT = 60 * 10
@@ -0,0 +1,15 @@
+"""Профиль развёртывания под ASGI-сервером (uvicorn, daphne).
+
+    uvicorn blogicum.asgi:application --workers 4
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+ASYNC_VIEWS = True
+
+# Под ASGI синхронный код каждого запроса идёт в своём потоке, а потоки
+# не живут дольше запроса: постоянное подключение некому переиспользовать.
+DATABASES = {
+    **DATABASES,
+    'default': {**DATABASES['default'], 'CONN_MAX_AGE': 0},
+}
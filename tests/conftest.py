@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,30 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Откат транзакций в тестах не затрагивает кеш, а id объектов
+    # в SQLite переиспользуются между тестами.
+    cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def raise_on_repeated_queries():
+    # Каждый запрос тестового клиента проходит QueryGuardMiddleware:
+    # N+1 в любой view или шаблоне роняет тест.
+    with override_settings(QUERY_GUARD='raise'):
+        yield
+
+
+@pytest.fixture
+def query_guard():
+    """Фабрика QueryGuard для проверки кода вне запросов."""
+    from blog.query_guard import QueryGuard
+
+    return QueryGuard
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +388,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse
+
+from blog.models import Comment
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    mixer.cycle(3).blend(Comment, post=post_with_published_location)
+    return post_with_published_location
+
+
+def test_api_index_lists_published_posts(
+        client, many_posts_with_published_locations):
+    data = client.get(reverse('blog:api_index')).json()
+    assert len(data['results']) == N_PER_PAGE
+    assert data['previous'] is None
+    next_data = client.get(data['next']).json()
+    seen = {post['id'] for post in data['results'] + next_data['results']}
+    assert len(seen) == len(data['results']) + len(next_data['results'])
+
+
+def test_api_post_detail(client, commented_post):
+    url = reverse('blog:api_post_detail', args=(commented_post.pk,))
+    data = client.get(url).json()
+    assert data['id'] == commented_post.pk
+    assert data['title'] == commented_post.title
+    assert data['author'] == commented_post.author.username
+    assert data['category']['slug'] == commented_post.category.slug
+    assert data['comment_count'] == len(data['comments']) == 3
+
+
+def test_api_post_detail_hides_unpublished_post(
+        client, user_client, commented_post):
+    commented_post.is_published = False
+    commented_post.save()
+    url = reverse('blog:api_post_detail', args=(commented_post.pk,))
+    assert client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200
+
+
+def test_api_returns_not_modified_until_content_changes(
+        client, commented_post):
+    url = reverse('blog:api_category_posts', args=(
+        commented_post.category.slug,
+    ))
+    response = client.get(url)
+    etag = response['ETag']
+    assert response.has_header('Last-Modified')
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    ).status_code == 304
+
+    commented_post.title = 'Новый заголовок'
+    commented_post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['results'][0]['title'] == 'Новый заголовок'
+
+
+def test_api_etag_depends_on_viewer(client, user_client, user, commented_post):
+    url = reverse('blog:api_profile', args=(user.username,))
+    assert client.get(url)['ETag'] != user_client.get(url)['ETag']
@@ -0,0 +1,143 @@
+import asyncio
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.http import Http404
+from django.core.handlers.asgi import ASGIHandler
+from django.test import Client, RequestFactory
+from django.urls import resolve
+
+from blog import async_views, views
+from blog.loadtest import blog_views, run_load_test, serve_asgi
+from blog.metrics import registry
+from blog.models import Comment, Post
+from blog.query_guard import QueryGuard, RepeatedQueriesError
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_TOKEN_RE = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]*"')
+
+
+@pytest.fixture(autouse=True)
+def render_every_request(settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    settings.ASYNC_VIEWS_PARALLEL_QUERIES = False
+
+
+@pytest.fixture
+def commented_post(mixer, many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    mixer.cycle(3).blend(Comment, post=post)
+    return post
+
+
+def get_page_args(post):
+    return (
+        ('PostListView', '/', {}),
+        ('PostListView', '/?page=2', {}),
+        ('PostDetailView', f'/posts/{post.pk}/', {'pk': post.pk}),
+        ('CategoryPostsView', '/', {'category_slug': post.category.slug}),
+        ('ProfileDetailView', '/', {'username': post.author.username}),
+    )
+
+
+def render(view_class, path, user, kwargs):
+    request = RequestFactory().get(path)
+    request.user = user
+    request.session = SessionStore()
+    view = view_class.as_view()
+    if asyncio.iscoroutinefunction(view):
+        view = async_to_sync(view)
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    # CSRF-токен формы комментария свой у каждого ответа.
+    return CSRF_TOKEN_RE.sub(b'', response.content)
+
+
+@pytest.mark.parametrize('pagination', ('numbered', 'cursor'))
+def test_async_views_render_same_pages(settings, pagination, commented_post):
+    settings.POSTS_PAGINATION = pagination
+    for user in (AnonymousUser(), commented_post.author):
+        for name, path, kwargs in get_page_args(commented_post):
+            async_view = getattr(async_views, name)
+            assert asyncio.iscoroutinefunction(async_view.as_view())
+            assert render(async_view, path, user, kwargs) == render(
+                getattr(views, name), path, user, kwargs,
+            ), (name, path)
+
+
+def test_async_list_view_rejects_missing_page(commented_post):
+    with pytest.raises(Http404):
+        render(async_views.PostListView, '/?page=99', AnonymousUser(), {})
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_run_queries_in_parallel(settings, commented_post):
+    settings.ASYNC_VIEWS_PARALLEL_QUERIES = True
+    for name, path, kwargs in get_page_args(commented_post):
+        content = render(
+            getattr(async_views, name), path, AnonymousUser(), kwargs,
+        )
+        assert content == render(
+            getattr(views, name), path, AnonymousUser(), kwargs,
+        ), (name, path)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_queries_reach_metrics(settings, commented_post):
+    settings.METRICS_SLOW_REQUEST_SECONDS = 0
+    settings.QUERY_GUARD = None
+    path = f'/posts/{commented_post.pk}/'
+
+    def get_queries(serve):
+        # Часы публикаций и Last-Modified первый запрос кладёт в кеш.
+        cache.clear()
+        registry.reset()
+        serve()
+        return [
+            request['queries'] for request in registry.get_slow_requests()
+            if request['path'] == path
+        ]
+
+    expected = get_queries(lambda: Client().get(path))
+    settings.ASYNC_VIEWS_PARALLEL_QUERIES = True
+    with blog_views(use_async=True):
+        queries = get_queries(lambda: asyncio.run(
+            serve_asgi(ASGIHandler(), path, slow=False, delay=0),
+        ))
+    assert queries == expected and expected[0] > 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_query_guard_sees_parallel_queries(settings, commented_post):
+    settings.ASYNC_VIEWS_PARALLEL_QUERIES = True
+
+    async def query_repeatedly():
+        await async_views.run_query(
+            lambda: [list(Post.objects.all()[:1]) for _ in range(3)],
+        )
+
+    with pytest.raises(RepeatedQueriesError):
+        with QueryGuard(threshold=2):
+            async_to_sync(query_repeatedly)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_load_test_compares_wsgi_and_asgi(commented_post):
+    with blog_views(use_async=True):
+        assert asyncio.iscoroutinefunction(resolve('/').func)
+    assert not asyncio.iscoroutinefunction(resolve('/').func)
+
+    results = run_load_test(
+        clients=4, slow_clients=2, requests=2, delay=0.01, workers=2,
+    )
+    assert [result['mode'] for result in results] == ['wsgi', 'asgi']
+    for result in results:
+        assert result['requests'] == 8
+        assert result['errors'] == 0
+        assert result['fast_latency'] and result['slow_latency']
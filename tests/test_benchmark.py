@@ -0,0 +1,19 @@
+import pytest
+
+from blog.benchmark import get_scale_counts, run_benchmark
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_covers_every_blog_url():
+    results = run_benchmark([20], requests=2, roles=('guest', 'author'))
+    counts = get_scale_counts(20, 5)
+    assert Post.objects.count() == counts['posts']
+    assert Comment.objects.count() == counts['comments']
+
+    urls = {result['url'] for result in results}
+    assert {'index', 'post_detail', 'category_posts', 'profile'} <= urls
+    assert len(results) == 2 * len(urls)
+    for result in results:
+        assert result['status'] < 500, result['path']
+        assert result['p50_ms'] <= result['p99_ms'] <= result['max_ms']
@@ -0,0 +1,30 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comment_writes(
+        mixer, post_with_published_location):
+    comments = mixer.cycle(3).blend(
+        Comment, post=post_with_published_location,
+    )
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 3
+
+    comments[0].delete()
+    Comment.objects.filter(pk=comments[1].pk).delete()
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 1
+
+
+def test_rebuild_comment_counts(mixer, post_with_published_location):
+    mixer.cycle(2).blend(Comment, post=post_with_published_location)
+    Post.objects.update(comment_count=0)
+
+    call_command('rebuild_comment_counts', batch_size=1)
+
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 2
@@ -0,0 +1,79 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = 7
+N_PER_PAGE = 3
+
+
+@pytest.fixture
+def comments(mixer, post_with_published_location):
+    return mixer.cycle(N_COMMENTS).blend(
+        Comment, post=post_with_published_location,
+    )
+
+
+def ordered_pks(post):
+    return list(
+        post.comments.order_by('created_at', 'pk').values_list(
+            'pk', flat=True,
+        )
+    )
+
+
+@override_settings(COMMENTS_LIMIT=N_PER_PAGE)
+def test_comment_pages_follow_cursor(
+        client, post_with_published_location, comments):
+    post = post_with_published_location
+    url = reverse('blog:post_comments', args=(post.pk,))
+    page = client.get(
+        reverse('blog:post_detail', args=(post.pk,)),
+    ).context['comments']
+    seen = [comment.pk for comment in page]
+    while page.has_next():
+        data = client.get(
+            url, {'cursor': page.next_cursor, 'format': 'json'},
+        ).json()
+        page = client.get(url, {'cursor': page.next_cursor}).context[
+            'comments'
+        ]
+        for comment in page:
+            assert f'comment_{comment.pk}' in data['html']
+        seen.extend(comment.pk for comment in page)
+    assert seen == ordered_pks(post)
+    assert data['next_cursor'] is None
+
+
+@override_settings(COMMENTS_LIMIT=N_PER_PAGE)
+def test_comment_link_opens_page_ending_with_it(
+        client, post_with_published_location, comments):
+    expected = ordered_pks(post_with_published_location)
+    target = Comment.objects.get(pk=expected[4])
+    response = client.get(target.get_absolute_url())
+    assert response.status_code == 200
+    page = response.context['comments']
+    assert [comment.pk for comment in page] == expected[2:5]
+    assert page.has_previous() and page.has_next()
+    assert f'name="comment_{target.pk}"' in response.content.decode()
+
+
+def test_comments_endpoint_hides_unpublished_post(
+        client, post_with_published_location, comments):
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    url = reverse(
+        'blog:post_comments', args=(post_with_published_location.pk,),
+    )
+    assert client.get(url).status_code == 404
+
+
+def test_comments_endpoint_rejects_bad_cursor(
+        client, post_with_published_location):
+    url = reverse(
+        'blog:post_comments', args=(post_with_published_location.pk,),
+    )
+    assert client.get(url, {'cursor': 'garbage'}).status_code == 404
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from blog.cache import CONTENT_CHANGED_AT_KEY
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def settled_content():
+    # Фикстуры записаны в ту же секунду, что и проверяемая правка,
+    # а HTTP-даты считаются в секундах: сдвигаем прошлые записи назад.
+    cache.set(CONTENT_CHANGED_AT_KEY, time.time() - 60, timeout=None)
+
+
+@pytest.fixture
+def urls(post_with_published_location):
+    post = post_with_published_location
+    return (
+        reverse('blog:index'),
+        reverse('blog:category_posts', args=(post.category.slug,)),
+        reverse('blog:profile', args=(post.author.username,)),
+        reverse('blog:post_detail', args=(post.pk,)),
+    )
+
+
+def test_html_views_answer_not_modified(client, urls):
+    for url in urls:
+        response = client.get(url)
+        assert response.has_header('Last-Modified'), url
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'],
+        ).status_code == 304, url
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        ).status_code == 304, url
+
+
+def test_new_comment_moves_last_modified(
+        client, mixer, post_with_published_location, urls,
+        settled_content):
+    before = {url: client.get(url)['Last-Modified'] for url in urls}
+    mixer.blend(Comment, post=post_with_published_location)
+    for url in urls:
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=before[url])
+        assert response.status_code == 200, url
+        assert response['Last-Modified'] != before[url], url
+
+
+@pytest.mark.parametrize('change', ['delete_newest', 'edit_title'])
+def test_edits_and_deletes_move_last_modified(
+        client, mixer, post_with_published_location, change,
+        settled_content):
+    post = post_with_published_location
+    newest = mixer.blend(
+        Post, author=post.author, category=post.category,
+        pub_date=post.pub_date, is_published=True,
+    )
+    # newest записан после settled_content.
+    cache.set(CONTENT_CHANGED_AT_KEY, time.time() - 60, timeout=None)
+    url = (
+        reverse('blog:index') if change == 'delete_newest'
+        else reverse('blog:post_detail', args=(post.pk,))
+    )
+    before = client.get(url)['Last-Modified']
+
+    if change == 'delete_newest':
+        newest.delete()
+    else:
+        post.title = 'Новый заголовок'
+        post.save()
+
+    # Только If-Modified-Since, без If-None-Match, как шлют некоторые CDN.
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=before)
+    assert response.status_code == 200
+
+
+def test_relogin_changes_etag(client, user, urls):
+    client.force_login(user)
+    etag = client.get(urls[0])['ETag']
+    client.logout()
+    # Тот же пользователь с новой сессией и новым CSRF-токеном.
+    client.force_login(user)
+    assert client.get(
+        urls[0], HTTP_IF_NONE_MATCH=etag,
+    ).status_code == 200
@@ -0,0 +1,131 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.content_dump import export_rows
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def content(mixer, post_with_published_location, another_user):
+    mixer.cycle(3).blend(
+        Comment, post=post_with_published_location, author=another_user,
+    )
+    return post_with_published_location
+
+
+@pytest.fixture
+def dump_path(tmp_path, content):
+    path = tmp_path / 'content.jsonl.gz'
+    call_command('export_content', output=str(path), chunk_size=2,
+                 verbosity=0)
+    return path
+
+
+def test_export_writes_natural_keys(tmp_path, content):
+    path = tmp_path / 'content.jsonl'
+    call_command('export_content', output=str(path), verbosity=0)
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    post = next(row for row in rows if row['type'] == 'post')
+    assert post['author'] == content.author.username
+    assert post['category'] == content.category.slug
+    assert post['location'] == content.location.pk
+    assert [row['type'] for row in rows][-1] == 'comment'
+    assert not any('password' in row for row in rows)
+
+
+def test_passwords_exported_only_on_request(content, user):
+    users = [
+        row for row in export_rows(with_passwords=True)
+        if row['type'] == 'user'
+    ]
+    assert {row['password'] for row in users} >= {user.password}
+
+
+def test_import_restores_content(dump_path, content, another_user):
+    comments = list(Comment.objects.values_list(
+        'pk', 'post_id', 'author__username', 'text', 'created_at',
+    ))
+    dates = [
+        model.objects.values_list('created_at', flat=True).get()
+        for model in (Post, Category, Location)
+    ]
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    another_user.delete()
+
+    call_command('import_content', str(dump_path), batch_size=2,
+                 stdout=StringIO())
+
+    post = Post.objects.get()
+    assert (post.pk, post.title) == (content.pk, content.title)
+    assert post.category.slug == content.category.slug
+    assert post.location.name == content.location.name
+    assert post.comment_count == 3
+    assert list(Comment.objects.values_list(
+        'pk', 'post_id', 'author__username', 'text', 'created_at',
+    )) == comments
+    assert [
+        model.objects.values_list('created_at', flat=True).get()
+        for model in (Post, Category, Location)
+    ] == dates
+    # Хеш пароля не выгружался: войти можно только после сброса.
+    assert not Comment.objects.first().author.has_usable_password()
+
+
+def test_import_is_idempotent(dump_path, content):
+    call_command('import_content', str(dump_path),
+                 stdout=StringIO())
+    assert Post.objects.count() == 1
+    assert Comment.objects.count() == 3
+    assert Location.objects.count() == 1
+
+
+def test_import_refuses_taken_ids(dump_path, content, mixer):
+    source_pk = content.pk
+    Comment.objects.all().delete()
+    content.delete()
+    unrelated = mixer.blend(
+        Post, pk=source_pk, author=content.author, title='Чужой пост',
+    )
+
+    with pytest.raises(CommandError, match='занят'):
+        call_command('import_content', str(dump_path), stdout=StringIO())
+    assert list(Post.objects.all()) == [unrelated]
+    assert not Comment.objects.exists()
+
+
+def test_import_keeps_locations_with_same_name(tmp_path, db):
+    path = tmp_path / 'locations.jsonl'
+    path.write_text(''.join(json.dumps({
+        'type': 'location', 'id': pk, 'name': 'Москва',
+        'is_published': is_published,
+        'created_at': '2020-01-01T00:00:00+00:00',
+    }) + '\n' for pk, is_published in ((5, True), (6, False))))
+    stdout = StringIO()
+    call_command('import_content', str(path), stdout=stdout)
+    assert list(Location.objects.order_by('pk').values_list(
+        'pk', 'is_published',
+    )) == [(5, True), (6, False)]
+    assert 'location — 2' in stdout.getvalue()
+
+    stdout = StringIO()
+    call_command('import_content', str(path), stdout=stdout)
+    assert Location.objects.count() == 2
+    assert 'location — 0' in stdout.getvalue()
+
+
+def test_import_rejects_unknown_author(tmp_path, db):
+    path = tmp_path / 'broken.jsonl'
+    path.write_text(json.dumps({
+        'type': 'comment', 'id': 1, 'text': 'x', 'post': 1,
+        'created_at': '2020-01-01T00:00:00Z', 'author': 'nobody',
+    }) + '\n')
+    with pytest.raises(CommandError):
+        call_command('import_content', str(path))
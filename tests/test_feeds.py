@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_urls(post_with_published_location):
+    post = post_with_published_location
+    return (
+        reverse('blog:feed'),
+        reverse('blog:feed_atom'),
+        reverse('blog:category_feed', args=(post.category.slug,)),
+        reverse('blog:category_feed_atom', args=(post.category.slug,)),
+        reverse('blog:profile_feed', args=(post.author.username,)),
+        reverse('blog:profile_feed_atom', args=(post.author.username,)),
+    )
+
+
+def test_feeds_list_published_posts(
+        client, feed_urls, post_with_published_location):
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert post_with_published_location.title in response.content.decode()
+
+
+@override_settings(FEED_ITEMS_LIMIT=3)
+def test_feed_is_bounded(client, many_posts_with_published_locations):
+    content = client.get(reverse('blog:feed')).content.decode()
+    assert content.count('<item>') == 3
+
+
+def test_feed_served_from_cache(
+        client, feed_urls, django_assert_num_queries):
+    url = feed_urls[0]
+    first = client.get(url).content
+    # Только дата самой свежей публикации для ключа кеша.
+    with django_assert_num_queries(1):
+        assert client.get(url).content == first
+
+
+def test_feed_picks_up_released_post(
+        client, mixer, user, published_category, feed_urls):
+    url = feed_urls[0]
+    scheduled = mixer.blend(
+        Post,
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert scheduled.title not in client.get(url).content.decode()
+    # Отложенный пост вышел без записи, меняющей поколение контента.
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1),
+    )
+    assert scheduled.title in client.get(url).content.decode()
+
+
+def test_feed_of_unpublished_category_not_found(
+        client, post_with_published_location):
+    category = post_with_published_location.category
+    category.is_published = False
+    category.save()
+    url = reverse('blog:category_feed', args=(category.slug,))
+    assert client.get(url).status_code == 404
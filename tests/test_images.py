@@ -0,0 +1,70 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.images import WEBP, get_fallback_extension, get_variant_name
+from blog.models import Job, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def run_worker():
+    call_command('runworker', once=True, processes=0)
+
+
+def test_variants_generated_on_upload(post_with_published_location):
+    image = post_with_published_location.image
+    assert image
+    run_worker()
+    for width in settings.POST_IMAGE_WIDTHS:
+        for extension in (WEBP, get_fallback_extension(image.name)):
+            assert image.storage.exists(
+                get_variant_name(image.name, width, extension),
+            )
+
+
+def test_post_card_falls_back_to_original(
+        client, post_with_published_location):
+    response = client.get(reverse('blog:index'))
+    soup = BeautifulSoup(response.content.decode(), features='html.parser')
+    assert soup.find('picture') is None
+    assert soup.find(
+        'img', src=post_with_published_location.image.url,
+    ) is not None
+
+
+def test_post_card_uses_srcset(client, post_with_published_location):
+    run_worker()
+    response = client.get(reverse('blog:index'))
+    soup = BeautifulSoup(response.content.decode(), features='html.parser')
+    source = soup.find('source', type='image/webp')
+    img = soup.find('picture').find('img')
+    for width in settings.POST_IMAGE_WIDTHS:
+        assert f'{width}w' in source['srcset']
+        assert f'{width}w' in img['srcset']
+    assert img['src'] != post_with_published_location.image.url
+
+
+def test_cached_card_updated_after_worker(
+        client, post_with_published_location):
+    url = reverse('blog:index')
+    assert b'<picture' not in client.get(url).content
+    run_worker()
+    assert b'<picture' in client.get(url).content
+
+
+@pytest.mark.parametrize('deferred', [
+    lambda posts: posts.only('pk'),
+    lambda posts: posts.defer('image'),
+])
+def test_deferred_image_not_loaded(
+        mixer, user, django_assert_num_queries, deferred):
+    mixer.cycle(5).blend(Post, author=user)
+    with django_assert_num_queries(1):
+        posts = list(deferred(Post.objects.all()))
+    Job.objects.all().delete()
+    posts[0].title = 'Новый заголовок'
+    posts[0].save()
+    assert not Job.objects.exists()
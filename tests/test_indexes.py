@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' | '.join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса SQLite',
+)
+@pytest.mark.parametrize(
+    ('get_queryset', 'index_name'),
+    [
+        (
+            lambda user, category: Post.published_manager.all(),
+            'post_published_feed_idx',
+        ),
+        (
+            lambda user, category: category.posts(
+                manager='published_manager',
+            ).all(),
+            'post_category_feed_idx',
+        ),
+        (
+            lambda user, category: user.posts(
+                manager='published_manager',
+            ).all(),
+            'post_author_feed_idx',
+        ),
+        (
+            lambda user, category: user.posts(manager='owner_manager').all(),
+            'post_author_feed_idx',
+        ),
+    ],
+    ids=['index feed', 'category feed', 'author feed', 'owner feed'],
+)
+@pytest.mark.parametrize(
+    'ordering', [('-pub_date',), ('-pub_date', '-pk')],
+    ids=['numbered', 'cursor'],
+)
+def test_feed_query_uses_index(
+        user, published_category, get_queryset, index_name, ordering):
+    queryset = get_queryset(user, published_category).order_by(*ordering)
+    plan = get_query_plan(queryset[:10])
+    assert index_name in plan, plan
+    assert 'TEMP B-TREE' not in plan, plan
@@ -0,0 +1,71 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.jobs import claim_job, enqueue, execute_job, run_pending_jobs
+from blog.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+def flaky_task(fail_times):
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise RuntimeError('Временная ошибка')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def test_enqueue_with_key_is_deduplicated():
+    assert enqueue(f'{__name__}.flaky_task', key='same', fail_times=0)
+    assert enqueue(f'{__name__}.flaky_task', key='same', fail_times=0) is None
+    assert Job.objects.count() == 1
+
+
+def test_job_claimed_only_once():
+    job = enqueue(f'{__name__}.flaky_task', fail_times=0)
+    assert claim_job() == job.pk
+    assert claim_job() is None
+
+
+@override_settings(JOBS_RETRY_DELAY=0)
+def test_failed_job_retried_then_done():
+    job = enqueue(f'{__name__}.flaky_task', fail_times=1)
+    assert execute_job(claim_job()) == Job.Status.PENDING
+    assert run_pending_jobs() == 1
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE
+    assert job.attempts == 2
+    assert 'Временная ошибка' in job.last_error
+
+
+@override_settings(JOBS_RETRY_DELAY=0)
+def test_job_fails_after_max_attempts():
+    job = Job.objects.create(
+        task=f'{__name__}.flaky_task',
+        payload={'fail_times': 10},
+        max_attempts=2,
+    )
+    run_pending_jobs()
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED
+    assert job.attempts == 2
+
+
+@override_settings(
+    EMAIL_BACKEND='blog.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+def test_email_sent_by_worker():
+    mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+    assert not mail.outbox
+    assert Job.objects.filter(task='blog.tasks.send_email').exists()
+
+    call_command('runworker', once=True, processes=0)
+    assert [message.subject for message in mail.outbox] == ['Тема']
@@ -0,0 +1,77 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.forms import PostForm
+from blog.lookups import (LOOKUP_VERSION_KEY, get_lookup_table,
+                          get_published_category_or_404)
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_categories():
+    return get_lookup_table(Category).objects
+
+
+def test_lookups_loaded_once(published_category, another_category):
+    assert get_categories() == [published_category, another_category]
+    with CaptureQueriesContext(connection) as queries:
+        assert get_published_category_or_404(
+            published_category.slug,
+        ) == published_category
+        get_categories()
+    assert not queries.captured_queries
+
+
+def test_lookups_follow_writes(published_category):
+    get_published_category_or_404(published_category.slug)
+    published_category.is_published = False
+    published_category.save()
+    with pytest.raises(Http404):
+        get_published_category_or_404(published_category.slug)
+    published_category.delete()
+    assert get_categories() == []
+
+
+def test_lookups_expire_without_version_bump(published_category):
+    get_published_category_or_404(published_category.slug)
+    # Как если бы категорию скрыли в процессе с другим кешем.
+    version = cache.get(LOOKUP_VERSION_KEY)
+    published_category.is_published = False
+    published_category.save()
+    cache.set(LOOKUP_VERSION_KEY, version, timeout=None)
+    get_published_category_or_404(published_category.slug)
+
+    with override_settings(LOOKUP_CACHE_TIMEOUT=0):
+        with pytest.raises(Http404):
+            get_published_category_or_404(published_category.slug)
+
+
+def test_post_form_uses_lookups(
+        published_category, published_location, user_client):
+    user_client.get(reverse('blog:create_post'))
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(reverse('blog:create_post'))
+    content = response.content.decode()
+    assert published_category.title in content
+    assert published_location.name in content
+    assert not any(
+        'blog_category' in query['sql'] or 'blog_location' in query['sql']
+        for query in queries.captured_queries
+    )
+
+    form = PostForm(data={
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2030-01-01T10:00',
+        'category': published_category.pk,
+        'location': 'nope',
+    })
+    assert not form.is_valid()
+    assert list(form.errors) == ['location']
+    assert form.cleaned_data['category'] == published_category
@@ -0,0 +1,69 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from blog.metrics import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def metrics():
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.fixture
+def staff_client(client, user):
+    user.is_staff = True
+    user.save()
+    client.force_login(user)
+    return client
+
+
+def test_metrics_require_staff(client, user_client, metrics):
+    url = reverse('blog:metrics')
+    assert client.get(url).status_code == 302
+    assert user_client.get(url).status_code == 403
+
+
+def test_metrics_histograms_per_view(
+        client, staff_client, metrics, post_with_published_location):
+    client.get(reverse(
+        'blog:post_detail', args=(post_with_published_location.pk,),
+    ))
+    content = staff_client.get(reverse('blog:metrics')).content.decode()
+    assert (
+        'blog_requests_total{view="blog:post_detail",method="GET",'
+        'status="200"} 1'
+    ) in content
+    for name in (
+        'blog_request_duration_seconds',
+        'blog_request_queries',
+        'blog_request_db_seconds',
+        'blog_request_template_seconds',
+        'blog_response_size_bytes',
+    ):
+        assert f'{name}_count{{view="blog:post_detail"}} 1' in content
+    assert (
+        'blog_request_queries_bucket{view="blog:post_detail",le="+Inf"} 1'
+    ) in content
+
+    histogram = metrics.histograms['blog_request_template_seconds'][
+        'blog:post_detail'
+    ]
+    assert histogram.sum > 0
+
+
+@override_settings(METRICS_SLOW_REQUEST_SECONDS=0)
+def test_slow_requests_keep_sql(
+        client, staff_client, metrics, post_with_published_location):
+    url = reverse(
+        'blog:post_detail', args=(post_with_published_location.pk,),
+    )
+    client.get(url)
+    slow = staff_client.get(reverse('blog:slow_requests')).json()['requests']
+    request = next(request for request in slow if request['path'] == url)
+    assert request['queries'] == len(request['sql']) > 0
+    assert any('blog_post' in sql for sql, _ in request['sql'])
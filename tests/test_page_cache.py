@@ -0,0 +1,51 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from blog.cache import get_content_generation, get_page_key
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_page_served_from_cache(
+        client, post_with_published_location, django_assert_num_queries):
+    url = reverse('blog:post_detail', args=(post_with_published_location.pk,))
+    first = client.get(url).content
+    with django_assert_num_queries(0):
+        assert client.get(url).content == first
+
+
+def test_authenticated_page_not_cached(
+        user_client, post_with_published_location):
+    url = reverse('blog:post_detail', args=(post_with_published_location.pk,))
+    user_client.get(url)
+    Post.objects.update(title='Заголовок без сигналов')
+    assert 'Заголовок без сигналов' in user_client.get(url).content.decode()
+
+
+def test_page_cache_invalidated_by_write(
+        client, post_with_published_location):
+    url = reverse('blog:index')
+    client.get(url)
+    post_with_published_location.title = 'Обновлённый заголовок'
+    post_with_published_location.save()
+    assert 'Обновлённый заголовок' in client.get(url).content.decode()
+
+
+def test_stale_page_served_while_revalidating(
+        client, rf, post_with_published_location):
+    url = reverse('blog:post_detail', args=(post_with_published_location.pk,))
+    client.get(url)
+    key = get_page_key(rf.get(url), get_content_generation())
+    entry = cache.get(key)
+    entry['fresh_until'] = 0
+    cache.set(key, entry)
+    Post.objects.update(title='Заголовок без сигналов')
+
+    # Пока другой запрос держит блокировку, отдаётся устаревшая копия.
+    cache.add(f'{key}:lock', True)
+    assert 'Заголовок без сигналов' not in client.get(url).content.decode()
+
+    cache.delete(f'{key}:lock')
+    assert 'Заголовок без сигналов' in client.get(url).content.decode()
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+from django.core.paginator import Paginator
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.templatetags.blog_tags import page_links
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = N_PER_PAGE * 2 + 5
+
+
+@pytest.fixture
+def posts_with_shared_pub_dates(mixer, user, published_category):
+    now = timezone.now()
+    pub_dates = (
+        now - timedelta(hours=index // 3) for index in range(N_POSTS)
+    )
+    return mixer.cycle(N_POSTS).blend(
+        Post,
+        author=user,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+
+
+@override_settings(POSTS_PAGINATION='cursor')
+def test_cursor_pagination_walks_feed(client, posts_with_shared_pub_dates):
+    expected = list(
+        Post.published_manager.order_by('-pub_date', '-pk').values_list(
+            'pk', flat=True,
+        )
+    )
+    seen, pages, url = [], [], '/'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.context['page_obj']
+        assert len(page) <= N_PER_PAGE
+        seen.extend(post.pk for post in page)
+        pages.append(page)
+        url = page.has_next() and f'/?cursor={page.next_cursor}'
+    assert seen == expected
+    assert not pages[0].has_previous()
+
+    response = client.get(f'/?cursor={pages[-1].previous_cursor}')
+    assert [post.pk for post in response.context['page_obj']] == [
+        post.pk for post in pages[-2]
+    ]
+
+
+@override_settings(POSTS_PAGINATION='cursor')
+def test_cursor_pagination_rejects_bad_cursor(client):
+    assert client.get('/?cursor=garbage').status_code == 404
+
+
+@override_settings(PAGINATOR_ON_ENDS=1, PAGINATOR_ON_EACH_SIDE=3)
+def test_page_links_are_windowed():
+    page = Paginator(range(1000), N_PER_PAGE).page(50)
+    links = page_links(page, 'q=test&')
+    ellipsis = page.paginator.ELLIPSIS
+    assert [link.number for link in links] == [
+        1, ellipsis, 47, 48, 49, 50, 51, 52, 53, ellipsis, 100,
+    ]
+    assert links[0].url == '?q=test&page=1'
+    assert [link.url for link in links if link.number == ellipsis] == [
+        None, None,
+    ]
+    assert [link.number for link in links if link.is_current] == [50]
+
+
+def test_paginator_links_every_page_of_short_feed(
+        client, posts_with_shared_pub_dates):
+    content = client.get('/').content.decode()
+    for number in range(2, N_POSTS // N_PER_PAGE + 2):
+        assert f'href="?page={number}"' in content
@@ -0,0 +1,39 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+def test_post_card_served_from_cache(
+        client, post_with_published_location, django_assert_num_queries):
+    url = reverse('blog:index')
+    first = client.get(url).content
+    # Повторная отрисовка не лезет в шаблон карточки, но страница та же.
+    with django_assert_num_queries(2):
+        assert client.get(url).content == first
+
+
+@pytest.mark.parametrize(
+    'change',
+    [
+        lambda post, mixer: mixer.blend(Comment, post=post),
+        lambda post, mixer: setattr(post, 'title', 'Новый заголовок')
+        or post.save(),
+        lambda post, mixer: setattr(post.category, 'title', 'Новая категория')
+        or post.category.save(),
+        lambda post, mixer: setattr(post.location, 'name', 'Новое место')
+        or post.location.save(),
+    ],
+    ids=['comment', 'post', 'category', 'location'],
+)
+def test_post_card_invalidated_on_change(
+        client, mixer, post_with_published_location, change):
+    url = reverse('blog:index')
+    before = client.get(url).content.decode()
+    change(post_with_published_location, mixer)
+    after = client.get(url).content.decode()
+    assert before != after
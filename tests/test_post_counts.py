@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import replicas
+from blog.models import Post, PostCounter
+from blog.post_counts import get_published_post_count, refresh_post_count
+
+pytestmark = [pytest.mark.django_db]
+
+Scope = PostCounter.Scope
+
+
+def assert_counts_match(*posts):
+    published = Post.published_manager
+    assert get_published_post_count(Scope.ALL) == published.count()
+    for post in posts:
+        assert get_published_post_count(
+            Scope.CATEGORY, post.category_id,
+        ) == published.filter(category_id=post.category_id).count()
+        assert get_published_post_count(
+            Scope.AUTHOR, post.author_id,
+        ) == published.filter(author_id=post.author_id).count()
+
+
+def stored_count(scope, object_id=0):
+    return PostCounter.objects.get(scope=scope, object_id=object_id).count
+
+
+def test_counts_follow_post_writes(
+        many_posts_with_published_locations, another_category):
+    post, other = many_posts_with_published_locations[:2]
+    total = stored_count(Scope.ALL)
+    assert total == Post.published_manager.count()
+
+    post.is_published = False
+    post.save()
+    assert stored_count(Scope.ALL) == total - 1
+
+    other.category = another_category
+    other.save()
+    assert stored_count(Scope.CATEGORY, another_category.pk) == 1
+    assert_counts_match(post, other)
+
+    other.delete()
+    assert stored_count(Scope.CATEGORY, another_category.pk) == 0
+    assert stored_count(Scope.ALL) == total - 2
+
+
+def test_counts_follow_category_publication(
+        many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    post.category.is_published = False
+    post.category.save()
+    assert stored_count(Scope.CATEGORY, post.category_id) == 0
+    assert stored_count(Scope.AUTHOR, post.author_id) == 0
+    assert_counts_match(post)
+
+
+def test_scheduled_post_counted_after_publication(
+        post_with_published_location):
+    post = post_with_published_location
+    before = get_published_post_count(Scope.ALL)
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    assert get_published_post_count(Scope.ALL) == before - 1
+    assert PostCounter.objects.get(
+        scope=Scope.ALL, object_id=0,
+    ).valid_until == post.pub_date
+
+    # Публикация наступает без записи в базу через модель.
+    past = timezone.now() - timedelta(minutes=1)
+    Post.objects.filter(pk=post.pk).update(pub_date=past)
+    PostCounter.objects.filter(valid_until__isnull=False).update(
+        valid_until=past,
+    )
+    assert get_published_post_count(Scope.ALL) == before
+
+
+def test_reconcile_post_counts(many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    PostCounter.objects.filter(scope=Scope.AUTHOR).delete()
+    PostCounter.objects.create(scope=Scope.CATEGORY, object_id=999, count=5)
+
+    call_command('reconcile_post_counts')
+
+    assert not PostCounter.objects.filter(object_id=999).exists()
+    assert_counts_match(post)
+    assert PostCounter.objects.filter(scope=Scope.AUTHOR).exists()
+
+
+def test_feed_pages_skip_count_query(
+        client, settings, many_posts_with_published_locations):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    post = many_posts_with_published_locations[0]
+    published = Post.published_manager
+    for url, expected in (
+        (reverse('blog:index'), published.count()),
+        (
+            reverse('blog:category_posts', args=(post.category.slug,)),
+            published.filter(category=post.category).count(),
+        ),
+        (
+            reverse('blog:profile', args=(post.author.username,)),
+            published.filter(author=post.author).count(),
+        ),
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.context['page_obj'].paginator.count == expected
+        assert not any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ), url
+
+
+@pytest.mark.django_db(transaction=True)
+def test_refresh_reads_primary_when_replicas_allowed(
+        settings, many_posts_with_published_locations):
+    # Реплики нет в DATABASES: чтение с неё упало бы.
+    settings.DATABASE_REPLICAS = ['replica']
+    expected = Post.published_manager.count()
+    token = replicas._current.set(replicas.ReplicaState(use_replicas=True))
+    try:
+        assert refresh_post_count(Scope.ALL) == expected
+    finally:
+        replicas._current.reset(token)
@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.publication_clock import (NO_PUBLICATION,
+                                    get_next_publication_timestamp)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_next_publication_tracks_future_posts(
+        post_with_published_location):
+    assert get_next_publication_timestamp() == NO_PUBLICATION
+
+    pub_date = timezone.now() + timedelta(hours=1)
+    post_with_published_location.pub_date = pub_date
+    post_with_published_location.save()
+    assert get_next_publication_timestamp() == pytest.approx(
+        pub_date.timestamp(),
+    )
+
+
+def test_feed_cache_expires_at_scheduled_publication(
+        client, post_with_published_location):
+    post_with_published_location.pub_date = (
+        timezone.now() + timedelta(seconds=1)
+    )
+    post_with_published_location.title = 'Отложенная публикация'
+    post_with_published_location.save()
+
+    url = reverse('blog:index')
+    assert 'Отложенная публикация' not in client.get(url).content.decode()
+
+    # Пост выходит без записи в базу: кеш страницы должен истечь сам.
+    time.sleep(1.1)
+    assert 'Отложенная публикация' in client.get(url).content.decode()
@@ -0,0 +1,51 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    mixer.cycle(5).blend(Comment, post=post_with_published_location)
+    # Копии картинки созданы, как после работы фонового исполнителя.
+    call_command('runworker', once=True, processes=0)
+    return post_with_published_location
+
+
+def test_post_detail_query_count_for_guest(
+        client, commented_post, django_assert_num_queries):
+    url = reverse('blog:post_detail', args=(commented_post.pk,))
+    # Поиск ближайшей отложенной публикации для версии страницы,
+    # пост со связанными объектами и комментарии с авторами.
+    with django_assert_num_queries(3):
+        assert client.get(url).status_code == 200
+
+
+def test_post_detail_query_count_for_author(
+        user_client, commented_post, django_assert_num_queries):
+    url = reverse('blog:post_detail', args=(commented_post.pk,))
+    # Сессия и пользователь, версия страницы, затем пост и комментарии.
+    with django_assert_num_queries(5):
+        assert user_client.get(url).status_code == 200
+
+
+def test_post_detail_hides_unpublished_post_from_guest(
+        client, commented_post):
+    commented_post.is_published = False
+    commented_post.save()
+    url = reverse('blog:post_detail', args=(commented_post.pk,))
+    assert client.get(url).status_code == 404
+
+
+def test_post_detail_not_modified_skips_rendering(
+        client, commented_post, django_assert_num_queries):
+    url = reverse('blog:post_detail', args=(commented_post.pk,))
+    response = client.get(url)
+    # Версия страницы и дата уже в кеше — 304 без единого запроса.
+    with django_assert_num_queries(0):
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        ).status_code == 304
@@ -0,0 +1,77 @@
+import pytest
+from django.urls import URLPattern, reverse
+
+from blog import urls as blog_urls
+from blog.models import Comment, Post
+from blog.query_guard import RepeatedQueriesError, get_query_shape
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def busy_blog(mixer, user, another_user, published_category,
+              published_locations):
+    user.is_staff = True
+    user.save()
+    posts = mixer.cycle(N_PER_PAGE).blend(
+        Post,
+        author=user,
+        category=published_category,
+        location=mixer.sequence(*published_locations),
+    )
+    for post in posts:
+        mixer.cycle(3).blend(
+            Comment,
+            post=post,
+            author=mixer.sequence(user, another_user, user),
+        )
+    return posts[0]
+
+
+def get_url_kwargs(post):
+    comment = post.comments.first()
+    return {
+        'pk': post.pk,
+        'comment_id': comment.pk,
+        'category_slug': post.category.slug,
+        'username': post.author.username,
+    }
+
+
+@pytest.mark.parametrize(
+    'name',
+    [
+        pattern.name for pattern in blog_urls.urlpatterns
+        if isinstance(pattern, URLPattern)
+    ],
+)
+@pytest.mark.parametrize('as_author', [False, True])
+def test_blog_views_have_no_repeated_queries(
+        name, as_author, client, user_client, busy_blog, query_guard):
+    kwargs = get_url_kwargs(busy_blog)
+    pattern = next(
+        pattern for pattern in blog_urls.urlpatterns
+        if getattr(pattern, 'name', None) == name
+    )
+    url = reverse(f'blog:{name}', kwargs={
+        key: kwargs[key] for key in pattern.pattern.converters
+    })
+    # Поиск без запроса пуст, поэтому ищем по слову из заголовка.
+    params = {'q': busy_blog.title.split()[0]} if name == 'search' else {}
+    with query_guard(label=url):
+        response = (user_client if as_author else client).get(url, params)
+    assert response.status_code < 500, url
+
+
+def test_query_guard_reports_repeated_shapes(query_guard, busy_blog):
+    with pytest.raises(RepeatedQueriesError):
+        with query_guard():
+            for post in Post.objects.all():
+                post.author.username
+
+
+def test_query_shape_collapses_in_lists():
+    assert get_query_shape('WHERE id IN (%s, %s, %s)') == get_query_shape(
+        'WHERE id IN (%s)',
+    )
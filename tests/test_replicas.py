@@ -0,0 +1,76 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.replicas import (ReplicaMiddleware, ReplicaRouter,
+                           get_replica_alias, mark_written)
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    return settings
+
+
+def run_request(method, cookies=None, write=None):
+    seen = {}
+
+    def view(request):
+        seen['before'] = get_replica_alias()
+        if write:
+            write()
+        seen['after'] = get_replica_alias()
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method)('/')
+    request.COOKIES.update(cookies or {})
+    response = ReplicaMiddleware(view)(request)
+    return seen, response
+
+
+def test_reads_outside_request_go_to_primary(replicas):
+    assert ReplicaRouter().db_for_read(None) == 'default'
+
+
+def test_safe_request_reads_from_replica(replicas):
+    seen, response = run_request('get')
+    assert seen == {'before': 'replica', 'after': 'replica'}
+    assert replicas.REPLICA_PIN_COOKIE not in response.cookies
+
+
+def test_write_pins_client_to_primary(replicas):
+    seen, response = run_request('post')
+    assert seen['before'] == 'default'
+    cookie = response.cookies[replicas.REPLICA_PIN_COOKIE]
+    assert cookie['max-age'] == replicas.REPLICA_PIN_SECONDS
+
+    seen, _ = run_request(
+        'get', cookies={replicas.REPLICA_PIN_COOKIE: cookie.value},
+    )
+    assert seen['before'] == 'default'
+
+
+def test_write_inside_safe_request_switches_to_primary(replicas):
+    seen, response = run_request('get', write=mark_written)
+    assert seen == {'before': 'replica', 'after': 'default'}
+    assert replicas.REPLICA_PIN_COOKIE in response.cookies
+
+
+def test_bookkeeping_write_keeps_replicas(replicas):
+    # Служебная запись, например задача воркера, клиента не пинит.
+    seen, response = run_request(
+        'get', write=lambda: ReplicaRouter().db_for_write(None),
+    )
+    assert seen['after'] == 'replica'
+    assert replicas.REPLICA_PIN_COOKIE not in response.cookies
+
+
+def test_no_pin_cookie_without_replicas():
+    _, response = run_request('post')
+    assert not response.cookies
+
+
+def test_migrations_skip_replicas(replicas):
+    router = ReplicaRouter()
+    assert router.allow_migrate('default', 'blog')
+    assert not router.allow_migrate('replica', 'blog')
@@ -0,0 +1,115 @@
+import pytest
+from django.urls import reverse
+
+from blog import search
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(params=['fts5', 'inverted'])
+def search_backend(request, monkeypatch):
+    backend = (
+        search.Fts5Backend() if request.param == 'fts5'
+        else search.InvertedIndexBackend()
+    )
+    if request.param == 'fts5' and not isinstance(
+        search.get_search_backend(), search.Fts5Backend,
+    ):
+        pytest.skip('SQLite собран без FTS5')
+    monkeypatch.setattr(search, 'get_search_backend', lambda: backend)
+    backend.clear()
+    return backend
+
+
+def get_found_titles(client, query):
+    response = client.get(reverse('blog:search'), {'q': query})
+    assert response.status_code == 200
+    return [post.title for post in response.context['page_obj']]
+
+
+def test_search_matches_word_forms_and_ranks_title_first(
+        client, mixer, search_backend, published_category):
+    mixer.blend(
+        'blog.Post', title='Заметки', text='Про красивые книги',
+        category=published_category,
+    )
+    mixer.blend(
+        'blog.Post', title='Книга недели', text='Обзор',
+        category=published_category,
+    )
+    assert get_found_titles(client, 'книгами') == [
+        'Книга недели', 'Заметки',
+    ]
+
+
+def test_search_covers_category_and_comments(
+        client, mixer, search_backend, published_category):
+    post = mixer.blend(
+        'blog.Post', title='Пост', text='Текст',
+        category=published_category,
+    )
+    published_category.title = 'Путешествия'
+    published_category.save()
+    mixer.blend(Comment, post=post, text='Отличная фотография')
+
+    assert get_found_titles(client, 'путешествие') == ['Пост']
+    assert get_found_titles(client, 'фотографии') == ['Пост']
+
+
+def test_search_respects_visibility(
+        client, mixer, search_backend, published_category):
+    mixer.blend(
+        'blog.Post', title='Скрытый пост', is_published=False,
+        category=published_category,
+    )
+    assert get_found_titles(client, 'скрытый') == []
+
+
+def test_search_index_follows_post_changes(
+        client, mixer, search_backend, published_category):
+    post = mixer.blend(
+        'blog.Post', title='Старый заголовок', category=published_category,
+    )
+    post.title = 'Новый заголовок'
+    post.save()
+    assert get_found_titles(client, 'старый') == []
+    assert get_found_titles(client, 'новый') == ['Новый заголовок']
+
+    post.delete()
+    assert get_found_titles(client, 'новый') == []
+
+
+def test_search_limit_counts_only_visible_posts(
+        client, mixer, settings, search_backend, published_category):
+    settings.SEARCH_RESULTS_LIMIT = 1
+    mixer.blend(
+        'blog.Post', title='Книга', text='Книга', is_published=False,
+        category=published_category,
+    )
+    mixer.blend(
+        'blog.Post', title='Обзор', text='Книга',
+        category=published_category,
+    )
+    assert get_found_titles(client, 'книга') == ['Обзор']
+
+
+def test_comment_indexed_apart_from_post(
+        client, mixer, monkeypatch, search_backend, published_category):
+    post = mixer.blend(
+        'blog.Post', title='Поход', text='Текст',
+        category=published_category,
+    )
+    mixer.cycle(3).blend(Comment, post=post, text='Старое обсуждение')
+
+    def reindex_post(*args):
+        raise AssertionError('Пост переиндексирован из-за комментария')
+
+    monkeypatch.setattr(search_backend, 'index', reindex_post)
+    comment = mixer.blend(Comment, post=post, text='Отличная фотография')
+    # Слова поста и комментария ищутся вместе.
+    assert get_found_titles(client, 'поход фотографии') == ['Поход']
+
+    comment.delete()
+    assert get_found_titles(client, 'фотографии') == []
+    assert get_found_titles(client, 'обсуждение') == ['Поход']
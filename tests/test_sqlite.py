@@ -0,0 +1,88 @@
+import json
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+
+from blog.sqlite import RetryLockedQueries
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_connection_has_pragmas_and_retry_wrapper():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == 5000
+    assert any(
+        isinstance(wrapper, RetryLockedQueries)
+        for wrapper in connection.execute_wrappers
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_connection_opened_inside_wrapper_keeps_retry():
+    def wrapper(execute, sql, params, many, context):
+        return execute(sql, params, many, context)
+
+    stacks = []
+
+    def open_connection():
+        # В новом потоке подключение откроется внутри обёртки.
+        thread_connection = connections['default']
+        try:
+            with thread_connection.execute_wrapper(wrapper):
+                thread_connection.ensure_connection()
+            stacks.append(list(thread_connection.execute_wrappers))
+        finally:
+            thread_connection.close()
+
+    thread = threading.Thread(target=open_connection)
+    thread.start()
+    thread.join()
+    [stack] = stacks
+    assert len(stack) == 1
+    assert isinstance(stack[0], RetryLockedQueries)
+
+
+class FlakyExecute:
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, sql, params, many, context):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OperationalError('database is locked')
+        return 'ok'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_query_retried_outside_transaction(settings):
+    settings.SQLITE_LOCK_RETRY_DELAY = 0
+    execute = FlakyExecute(failures=2)
+    assert RetryLockedQueries(connection)(
+        execute, 'SELECT 1', None, False, {},
+    ) == 'ok'
+    assert execute.calls == 3
+
+
+def test_locked_query_not_retried_inside_transaction(settings):
+    settings.SQLITE_LOCK_RETRY_DELAY = 0
+    execute = FlakyExecute(failures=1)
+    with pytest.raises(OperationalError), transaction.atomic():
+        RetryLockedQueries(connection)(execute, 'SELECT 1', None, False, {})
+    assert execute.calls == 1
+
+
+def test_sqlite_benchmark_compares_modes():
+    out = StringIO()
+    call_command('benchmark_sqlite', duration=0.2, posts=100, readers=1,
+                 writers=1, stdout=out)
+    modes = {result['mode']: result for result in json.loads(out.getvalue())}
+    assert set(modes) == {'default', 'tuned'}
+    assert modes['tuned']['reads'] > 0 and modes['tuned']['writes'] > 0
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.template import engines
+
+from blog.warmup import warm_up
+
+
+def get_cached_template_names():
+    names = set()
+    for backend in engines.all():
+        for loader in backend.engine.template_loaders:
+            names.update(
+                name for name, template in loader.get_template_cache.items()
+                if not isinstance(template, type)
+            )
+    return names
+
+
+def test_warm_up_compiles_templates_without_queries():
+    # Без отметки django_db любой запрос к базе упадёт.
+    stats = warm_up()
+    assert stats['templates'] > 0
+    assert stats['urls'] > 0
+    names = get_cached_template_names()
+    assert {
+        'base.html',
+        'blog/index.html',
+        'includes/post_card.html',
+        'django_bootstrap5/field_errors.html',
+    } <= names
+
+
+def test_template_engine_keeps_django_alias():
+    assert engines['django'] is engines.all()[0]
+
+
+@pytest.mark.parametrize('start, warmed', [
+    ('import django; django.setup()', False),
+    ('import blogicum.wsgi', True),
+])
+def test_only_server_entry_point_warms_up(start, warmed):
+    # Команды manage.py и runworker поднимают Django без wsgi.py.
+    script = (
+        f'{start}; from django.template import engines; '
+        'print(sum(len(loader.get_template_cache) '
+        'for backend in engines.all() '
+        'for loader in backend.engine.template_loaders))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'blogicum.settings'},
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert (int(result.stdout) > 0) is warmed